@@ -0,0 +1,46 @@
+"""Throughput of the batch entry points against a Python loop of single calls."""
+import numpy as np
+
+import pyrexact2x2
+
+
+class TimeBatchThroughput:
+    params = [100, 1000]
+    param_names = ["tables"]
+    timeout = 600.0
+
+    def setup(self, tables):
+        pyrexact2x2.get_session().warmup()
+        rng = np.random.default_rng(0)
+        self.n1 = rng.integers(5, 30, tables)
+        self.n2 = rng.integers(5, 30, tables)
+        self.x1 = rng.integers(0, self.n1 + 1)
+        self.x2 = rng.integers(0, self.n2 + 1)
+
+    def time_loop(self, tables):
+        for row in zip(self.x1, self.n1, self.x2, self.n2):
+            pyrexact2x2.uncondExact2x2(*(int(v) for v in row))
+
+    def time_many(self, tables):
+        pyrexact2x2.uncondExact2x2_many(self.x1, self.n1, self.x2, self.n2)
+
+
+class TimePoolScaling:
+    params = [1, 2, 4, 8]
+    param_names = ["workers"]
+    timeout = 600.0
+
+    def setup(self, workers):
+        rng = np.random.default_rng(0)
+        self.n1 = rng.integers(5, 30, 2000)
+        self.n2 = rng.integers(5, 30, 2000)
+        self.x1 = rng.integers(0, self.n1 + 1)
+        self.x2 = rng.integers(0, self.n2 + 1)
+        self.pool = pyrexact2x2.Pool(workers=workers)
+        self.pool.map(1, 5, 0, 6)
+
+    def teardown(self, workers):
+        self.pool.terminate()
+
+    def time_map(self, workers):
+        self.pool.map(self.x1, self.n1, self.x2, self.n2)
@@ -0,0 +1,37 @@
+"""Batch throughput of the native NumPy engine."""
+import numpy as np
+
+import pyrexact2x2
+
+
+class TimeNumpyThroughput:
+    params = ["boschloo", "uncondExact2x2"]
+    param_names = ["test"]
+    timeout = 300.0
+
+    def setup(self, test):
+        rng = np.random.default_rng(0)
+        n1 = rng.integers(5, 30, 200)
+        n2 = rng.integers(5, 30, 200)
+        self.tables = list(zip(rng.integers(0, n1 + 1), n1, rng.integers(0, n2 + 1), n2))
+        self.func = getattr(pyrexact2x2, test)
+
+    def time_tables(self, test):
+        for x1, n1, x2, n2 in self.tables:
+            self.func(int(x1), int(n1), int(x2), int(n2), engine="numpy")
+
+
+class TimeBoschlooCI:
+    params = ["numpy", "R"]
+    param_names = ["engine"]
+    timeout = 300.0
+
+    def setup(self, engine):
+        rng = np.random.default_rng(0)
+        n1 = rng.integers(5, 30, 20)
+        n2 = rng.integers(5, 30, 20)
+        self.tables = list(zip(rng.integers(0, n1 + 1), n1, rng.integers(0, n2 + 1), n2))
+
+    def time_conf_int(self, engine):
+        for x1, n1, x2, n2 in self.tables:
+            pyrexact2x2.boschloo(int(x1), int(n1), int(x2), int(n2), conf_int=True, engine=engine)
@@ -0,0 +1,35 @@
+"""Scaling of single tests in the group sizes for each method and parmtype."""
+import pyrexact2x2
+
+METHODS = ["FisherAdj", "simple", "wald-pooled", "wald-unpooled", "score"]
+PARMTYPES = ["difference", "ratio", "oddsratio"]
+
+
+class TimeUncondExact2x2Scaling:
+    params = (["R", "numpy"], METHODS, PARMTYPES, [10, 40, 160])
+    param_names = ["engine", "method", "parmtype", "n"]
+    timeout = 300.0
+
+    def setup(self, engine, method, parmtype, n):
+        if method.startswith("wald") and parmtype != "difference":
+            raise NotImplementedError()
+        if engine == "R":
+            pyrexact2x2.get_session().warmup()
+
+    def time_uncondExact2x2(self, engine, method, parmtype, n):
+        pyrexact2x2.uncondExact2x2(
+            n // 4, n, n // 2, n + 3, method=method, parmtype=parmtype, engine=engine
+        )
+
+
+class TimeBoschlooScaling:
+    params = (["R", "numpy"], ["central", "minlike"], [10, 40, 160, 400])
+    param_names = ["engine", "tsmethod", "n"]
+    timeout = 300.0
+
+    def setup(self, engine, tsmethod, n):
+        if engine == "R":
+            pyrexact2x2.get_session().warmup()
+
+    def time_boschloo(self, engine, tsmethod, n):
+        pyrexact2x2.boschloo(n // 4, n, n // 2, n + 3, tsmethod=tsmethod, engine=engine)
@@ -0,0 +1,51 @@
+"""Start up cost and warm single call latency."""
+import pyrexact2x2
+
+
+class TimeColdStart:
+    timeout = 120.0
+
+    def timeraw_import(self):
+        return "import pyrexact2x2"
+
+    def timeraw_first_uncondExact2x2(self):
+        return "import pyrexact2x2; pyrexact2x2.uncondExact2x2(1, 5, 0, 6)"
+
+    def timeraw_first_boschloo(self):
+        return "import pyrexact2x2; pyrexact2x2.boschloo(1, 5, 0, 6)"
+
+    def timeraw_first_boschloo_numpy(self):
+        return "import pyrexact2x2; pyrexact2x2.boschloo(1, 5, 0, 6, engine='numpy')"
+
+
+class TimeCallOverhead:
+    """Per-call overhead of resolving exact2x2 through the persistent session
+    compared to running ``importr("exact2x2")`` on every call."""
+
+    def setup(self):
+        pyrexact2x2.get_session().warmup()
+
+    def time_importr_per_call(self):
+        from rpy2.robjects.packages import importr
+
+        importr("exact2x2").uncondExact2x2(1, 5, 0, 6)
+
+    def time_session_call(self):
+        pyrexact2x2.get_session().uncondExact2x2(1, 5, 0, 6)
+
+
+class TimeWarmLatency:
+    def setup(self):
+        import pandas as pd
+
+        pyrexact2x2.get_session().warmup()
+        self.df = pd.DataFrame([[28, 99], [17, 78]])
+
+    def time_uncondExact2x2(self):
+        pyrexact2x2.uncondExact2x2(1, 5, 0, 6)
+
+    def time_boschloo(self):
+        pyrexact2x2.boschloo(1, 5, 0, 6)
+
+    def time_uncondExact2x2DF(self):
+        pyrexact2x2.uncondExact2x2DF(self.df)
@@ -1,15 +1,123 @@
-from functools import partialmethod
-
-from pandas.core.indexing import convert_from_missing_indexer_tuple
-from ._version import get_versions
-
-__version__ = get_versions()["version"]
-del get_versions
-
-__all__ = ["uncondExact2x2", "uncondExact2x2DF"]
-
-import pandas as pd
-from typing import Dict, Optional
+"""Python interface to the R package exact2x2.
+
+Importing the package is cheap: pandas, NumPy and rpy2 are imported only when
+a function needing them is first used, and the submodules behind the batch,
+parallel, async and precomputed store APIs are loaded on first attribute
+access.
+"""
+import importlib
+from typing import TYPE_CHECKING, Dict, Optional, Tuple
+
+from . import _cache, _canonical, _control, _instrument
+from ._session import RSession, get_session, to_r
+from ._instrument import (
+    Instrumentation,
+    instrument,
+    enable_instrumentation,
+    disable_instrumentation,
+)
+from ._control import ucControl
+from ._result import Result, BatchResult
+from ._cache import DiskCache, enable_cache, disable_cache, cache_info, disk_cache_info, cache_clear
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+__all__ = [
+    "uncondExact2x2",
+    "uncondExact2x2DF",
+    "uncondExact2x2DF_many",
+    "boschloo",
+    "uncondExact2x2_many",
+    "boschloo_many",
+    "batch_info",
+    "batch_info_clear",
+    "uncondExact2x2Pvals",
+    "uncondExact2x2_pvalues",
+    "Result",
+    "BatchResult",
+    "PvalueStore",
+    "build_store",
+    "decide",
+    "decide_many",
+    "pvalue_bounds",
+    "multiple_tests",
+    "MultipleTests",
+    "IncrementalTester",
+    "Pool",
+    "Daemon",
+    "connect_daemon",
+    "disconnect_daemon",
+    "AsyncPool",
+    "get_async_pool",
+    "set_async_pool",
+    "uncondExact2x2_async",
+    "boschloo_async",
+    "uncondExact2x2_many_async",
+    "boschloo_many_async",
+    "enable_cache",
+    "disable_cache",
+    "cache_info",
+    "disk_cache_info",
+    "DiskCache",
+    "cache_clear",
+    "ucControl",
+    "set_numpy_cache_size",
+    "Instrumentation",
+    "instrument",
+    "enable_instrumentation",
+    "disable_instrumentation",
+    "RSession",
+    "get_session",
+]
+
+# Public names importing NumPy or other heavy modules, resolved on first use.
+_LAZY = {
+    "uncondExact2x2_many": "._batch",
+    "boschloo_many": "._batch",
+    "batch_info": "._batch",
+    "batch_info_clear": "._batch",
+    "Pool": "._pool",
+    "Daemon": "._daemon",
+    "connect_daemon": "._daemon",
+    "disconnect_daemon": "._daemon",
+    "AsyncPool": "._async",
+    "get_async_pool": "._async",
+    "set_async_pool": "._async",
+    "uncondExact2x2_async": "._async",
+    "boschloo_async": "._async",
+    "uncondExact2x2_many_async": "._async",
+    "boschloo_many_async": "._async",
+    "uncondExact2x2Pvals": "._pvals",
+    "uncondExact2x2_pvalues": "._pvals",
+    "PvalueStore": "._store",
+    "build_store": "._store",
+    "decide": "._decide",
+    "decide_many": "._decide",
+    "pvalue_bounds": "._decide",
+    "multiple_tests": "._multiple",
+    "MultipleTests": "._multiple",
+    "IncrementalTester": "._incremental",
+    "set_numpy_cache_size": "._numpy_engine",
+}
+
+
+def __getattr__(name: str):
+    if name == "__version__":
+        # versioneer may run git, so the version is looked up only on request.
+        from ._version import get_versions
+
+        value = get_versions()["version"]
+    elif name in _LAZY:
+        value = getattr(importlib.import_module(_LAZY[name], __name__), name)
+    else:
+        raise AttributeError("module %r has no attribute %r" % (__name__, name))
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_LAZY) | {"__version__"})
 
 
 def uncondExact2x2(
@@ -27,8 +135,10 @@ def uncondExact2x2(
     gamma: float = 0.0,
     EplusM: bool = False,
     tiebreak: bool = False,
-    conf_int:bool = False
-) -> Dict:
+    conf_int: bool = False,
+    engine: str = "R",
+    control: Optional[Dict] = None,
+) -> Result:
     """
           x1: number of events in group 1
 
@@ -67,6 +177,15 @@ def uncondExact2x2(
 
     tiebreak: logical, do tiebreak adjustment? (see details)
 
+      engine: "R" to call exact2x2::uncondExact2x2, or "numpy" for the
+              native implementation of the methods "simple", "wald-pooled",
+              "wald-unpooled", "score" and "FisherAdj", which needs no R
+              installation but does not support gamma, EplusM, tiebreak or
+              conf_int.
+
+     control: dict of settings of the numerical searches, see ``ucControl``.
+              Missing settings take their defaults.
+
 
     Details:
 
@@ -198,6 +317,12 @@ def uncondExact2x2(
 
     data.name: description of data
 
+         In Python the list is returned as a ``Result`` whose attributes
+         p_value, ci_low, ci_high, estimate, statistic, parameter,
+         null_value, alternative, method and data_name hold these elements.
+         The R names are accepted as keys, ``res["conf.int"]`` being the
+         pair (ci_low, ci_high).
+
     Warning:
 
          The algorithm for calculating the p-values and confidence
@@ -243,12 +368,43 @@ def uncondExact2x2(
     if method != "simple" and tiebreak:
         warning("Ignoring tiebreak, since %s != simple", method)
         tiebreak = False
-    from rpy2.robjects.packages import importr
-
-    
-    exact2x2 = importr("exact2x2")
 
-    res = exact2x2.uncondExact2x2(
+    options = (
+        conf_level, method, tsmethod, midp, gamma, EplusM, tiebreak, conf_int, engine, control
+    )
+    allowed = _canonical.uncond_symmetries(parmtype, method, gamma, tiebreak)
+    if _cache.canonical() and allowed is not None:
+        sym, table, null_c, alt_c = _canonical.canonical(
+            x1, n1, x2, n2, parmtype, nullparm, alternative, *allowed
+        )
+        if sym.swap or sym.flip:
+            res = _uncondExact2x2(*table, parmtype, null_c, alt_c, *options)
+            return sym.restore(res, x1, n1, x2, n2, nullparm, alternative)
+    return _uncondExact2x2(x1, n1, x2, n2, parmtype, nullparm, alternative, *options)
+
+
+def _uncondExact2x2(
+    x1,
+    n1,
+    x2,
+    n2,
+    parmtype,
+    nullparm,
+    alternative,
+    conf_level,
+    method,
+    tsmethod,
+    midp,
+    gamma,
+    EplusM,
+    tiebreak,
+    conf_int,
+    engine,
+    control,
+) -> Result:
+    "``uncondExact2x2`` with the defaults resolved, through the cache."
+    key = (
+        "uncondExact2x2",
         x1,
         n1,
         x2,
@@ -264,11 +420,96 @@ def uncondExact2x2(
         gamma,
         EplusM,
         tiebreak,
+        engine,
+        _control.key(control),
     )
-
-    res_d = {}
-    for k, v in res.items():
-        res_d[k] = v[0]
+    with _instrument.phase("uncondExact2x2", method, engine, "cache_lookup"):
+        res_d = _cache.lookup(key)
+    if res_d is not None:
+        return res_d
+
+    if engine == "numpy":
+        from . import _numpy_engine
+
+        with _instrument.phase("uncondExact2x2", method, engine, "compute"):
+            res_d = _numpy_engine.uncondExact2x2(
+                x1,
+                n1,
+                x2,
+                n2,
+                parmtype,
+                nullparm,
+                alternative,
+                conf_level,
+                method,
+                tsmethod,
+                midp,
+                gamma,
+                EplusM,
+                tiebreak,
+                conf_int,
+                control,
+            )
+        _cache.store(key, res_d)
+        return res_d
+    if engine != "R":
+        raise ValueError("engine must be 'R' or 'numpy', got %r" % engine)
+
+    from . import _daemon
+
+    remote = _daemon.forward(
+        "uncondExact2x2",
+        x1,
+        n1,
+        x2,
+        n2,
+        parmtype,
+        nullparm,
+        alternative,
+        conf_level,
+        method,
+        tsmethod,
+        midp,
+        gamma,
+        EplusM,
+        tiebreak,
+        conf_int,
+        engine,
+        control,
+    )
+    if remote is not None:
+        res_d = Result(*remote)
+        _cache.store(key, res_d)
+        return res_d
+
+    with _instrument.phase("uncondExact2x2", method, engine, "import"):
+        session = get_session().init()
+    with _instrument.phase("uncondExact2x2", method, engine, "convert_in"):
+        args = to_r(
+            (
+                x1,
+                n1,
+                x2,
+                n2,
+                parmtype,
+                nullparm,
+                alternative,
+                conf_int,
+                conf_level,
+                method,
+                tsmethod,
+                midp,
+                gamma,
+                EplusM,
+                tiebreak,
+            )
+        )
+    with _instrument.phase("uncondExact2x2", method, engine, "compute"):
+        res = _control.call_r(session.uncondExact2x2, args, control)
+
+    with _instrument.phase("uncondExact2x2", method, engine, "convert_out"):
+        res_d = Result.from_htest(res.items())
+    _cache.store(key, res_d)
     return res_d
 
 
@@ -283,31 +524,150 @@ def boschloo(
     conf_level: float = 0.95,
     midp=False,
     tsmethod="central",
-):
-    from rpy2.robjects.packages import importr
+    engine: str = "R",
+    control: Optional[Dict] = None,
+) -> Result:
+    """Boschloo's test: an unconditional exact test ordering the sample space
+    by Fisher's exact p-values.
 
-    conf_int = False
-    exact2x2 = importr("exact2x2")
+    tsmethod: two-sided method, either "central" or "minlike"
 
-    res = exact2x2.boschloo(
-        x1, n1, x2, n2, alternative, OR, conf_int, conf_level, midp, tsmethod
-    )
+      engine: "R" to call exact2x2::boschloo, or "numpy" for the native
+              implementation which needs no R installation.
 
-    res_d = {}
-    for k, v in res.items():
-        res_d[k] = v[0]
+    Other arguments are as in ``uncondExact2x2``; OR is the odds ratio under
+    the null hypothesis, and with ``conf_int`` the confidence interval is
+    for the odds ratio.
+    """
+    options = (conf_int, conf_level, midp, tsmethod, engine, control)
+    if _cache.canonical():
+        sym, table, OR_c, alt_c = _canonical.canonical(x1, n1, x2, n2, "oddsratio", OR, alternative)
+        if sym.swap or sym.flip:
+            res = _boschloo(*table, alt_c, OR_c, *options)
+            return sym.restore(res, x1, n1, x2, n2, OR, alternative)
+    return _boschloo(x1, n1, x2, n2, alternative, OR, *options)
+
+
+def _boschloo(
+    x1, n1, x2, n2, alternative, OR, conf_int, conf_level, midp, tsmethod, engine, control
+) -> Result:
+    "``boschloo`` through the cache."
+    key = (
+        "boschloo",
+        x1,
+        n1,
+        x2,
+        n2,
+        alternative,
+        OR,
+        conf_int,
+        conf_level,
+        midp,
+        tsmethod,
+        engine,
+        _control.key(control),
+    )
+    with _instrument.phase("boschloo", tsmethod, engine, "cache_lookup"):
+        res_d = _cache.lookup(key)
+    if res_d is not None:
+        return res_d
+
+    if engine == "numpy":
+        from . import _numpy_engine
+
+        with _instrument.phase("boschloo", tsmethod, engine, "compute"):
+            res_d = _numpy_engine.boschloo(
+                x1, n1, x2, n2, alternative, OR, conf_int, conf_level, midp, tsmethod, control
+            )
+        _cache.store(key, res_d)
+        return res_d
+    if engine != "R":
+        raise ValueError("engine must be 'R' or 'numpy', got %r" % engine)
+
+    from . import _daemon
+
+    remote = _daemon.forward(
+        "boschloo",
+        x1,
+        n1,
+        x2,
+        n2,
+        alternative,
+        OR,
+        conf_int,
+        conf_level,
+        midp,
+        tsmethod,
+        engine,
+        control,
+    )
+    if remote is not None:
+        res_d = Result(*remote)
+        _cache.store(key, res_d)
+        return res_d
+
+    with _instrument.phase("boschloo", tsmethod, engine, "import"):
+        session = get_session().init()
+    with _instrument.phase("boschloo", tsmethod, engine, "convert_in"):
+        args = to_r((x1, n1, x2, n2, alternative, OR, conf_int, conf_level, midp, tsmethod))
+    with _instrument.phase("boschloo", tsmethod, engine, "compute"):
+        res = _control.call_r(session.boschloo, args, control)
+
+    with _instrument.phase("boschloo", tsmethod, engine, "convert_out"):
+        res_d = Result.from_htest(res.items())
+    _cache.store(key, res_d)
     return res_d
 
 
-def uncondExact2x2DF(df: pd.DataFrame, **kwargs) -> pd.Series:
-    from rpy2.robjects.packages import importr
+def uncondExact2x2DF(df: "pd.DataFrame", **kwargs) -> "pd.Series":
+    import pandas as pd
 
     assert df.shape == (2, 2), "Input dataframe must be of shape 2x2"
-    exact2x2 = importr("exact2x2")
     c1 = int(df.iloc[0, 0])
     c2 = int(df.iloc[1, 0])
     n1, n2 = [int(x) for x in df.sum(axis=1)]
 
     res_d = uncondExact2x2(c1, n1, c2, n2, **kwargs)
 
-    return pd.Series(res_d)
+    return pd.Series(res_d.to_dict())
+
+
+def uncondExact2x2DF_many(
+    df: "pd.DataFrame",
+    x1: str = "x1",
+    n1: str = "n1",
+    x2: str = "x2",
+    n2: str = "n2",
+    cells: Optional[Tuple[str, str, str, str]] = None,
+    **kwargs
+) -> "pd.DataFrame":
+    """Unconditional exact tests for a DataFrame with one 2x2 table per row.
+
+    Args:
+        df: Input tables, one per row.
+        x1, n1, x2, n2: Column names of the events and sample sizes of the
+            two groups.
+        cells: Alternatively, column names of the four cells in the order
+            (group 1 events, group 1 non-events, group 2 events, group 2
+            non-events), i.e. the 2x2 table of ``uncondExact2x2DF`` read
+            row by row. Overrides the x/n column names.
+        **kwargs: Options of ``uncondExact2x2_many``; either scalars or per
+            row values, e.g. another column of ``df``.
+
+    Returns:
+        pd.DataFrame: Columns of ``uncondExact2x2_many`` indexed like ``df``.
+    """
+    import numpy as np
+
+    from ._batch import uncondExact2x2_many
+
+    if cells is not None:
+        a, b, c, d = [df[k].to_numpy() for k in cells]
+        counts = (a, a + b, c, c + d)
+    else:
+        counts = tuple(df[k].to_numpy() for k in (x1, n1, x2, n2))
+    kwargs = {k: np.asarray(v) for k, v in kwargs.items()}
+
+    res = uncondExact2x2_many(*counts, **kwargs)
+
+    return res.to_frame(index=df.index)
@@ -0,0 +1,254 @@
+"""Command line interface of pyrexact2x2."""
+import argparse
+import csv
+import sys
+from collections import deque
+from itertools import islice
+from typing import Deque, Dict, Iterator, List, Optional, Tuple
+
+
+def _int_range(text: str) -> range:
+    "Parse 'a:b' as the inclusive range a..b, or a single integer."
+    lo, _, hi = text.partition(":")
+    return range(int(lo), int(hi or lo) + 1)
+
+
+def _bool(text: str) -> bool:
+    if text.lower() in ("1", "true", "t", "yes"):
+        return True
+    if text.lower() in ("0", "false", "f", "no"):
+        return False
+    raise argparse.ArgumentTypeError("Expected a boolean, got %r" % text)
+
+
+def _add_uncond_options(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument("--parmtype", default="difference")
+    parser.add_argument("--nullparm", type=float, default=None)
+    parser.add_argument("--alternative", default="two.sided")
+    parser.add_argument("--method", default="FisherAdj")
+    parser.add_argument("--tsmethod", default="central")
+    parser.add_argument("--midp", type=_bool, default=False)
+    parser.add_argument("--gamma", type=float, default=0.0)
+    parser.add_argument("--EplusM", type=_bool, default=False)
+    parser.add_argument("--tiebreak", type=_bool, default=False)
+
+
+_UNCOND_OPTIONS = (
+    "parmtype",
+    "nullparm",
+    "alternative",
+    "method",
+    "tsmethod",
+    "midp",
+    "gamma",
+    "EplusM",
+    "tiebreak",
+)
+
+
+_BOSCHLOO_OPTIONS = ("alternative", "OR", "conf_int", "conf_level", "midp", "tsmethod")
+
+
+class _InputError(ValueError):
+    "A row of the input that is not a table."
+
+
+def _rows(reader, counts: Dict[str, int]) -> Iterator[Tuple[List[str], List[int]]]:
+    """Non-blank rows of a CSV reader with their counts. Line numbers in
+    errors count the header line read before the reader."""
+    for row in reader:
+        if not any(cell.strip() for cell in row):
+            continue
+        try:
+            yield row, [int(row[i]) for i in counts.values()]
+        except (IndexError, ValueError):
+            raise _InputError(
+                "Line %d: no counts in columns %s: %r"
+                % (reader.line_num + 1, [i + 1 for i in counts.values()], row)
+            ) from None
+
+
+def _read_chunks(reader, counts: Dict[str, int], chunksize: int, rows: Deque) -> Iterator[Dict]:
+    """Count arrays of successive chunks of CSV rows, skipping blank rows. The
+    rows of each chunk are appended to ``rows`` for the writer to pick up with
+    its results.
+
+    Raises:
+        _InputError: A row without integer counts, with its line number.
+    """
+    import numpy as np
+
+    parsed = _rows(reader, counts)
+    while True:
+        chunk = list(islice(parsed, chunksize))
+        if not chunk:
+            return
+        rows.append([row for row, _ in chunk])
+        cols = {
+            k: np.array([v[j] for _, v in chunk], dtype=np.int64) for j, k in enumerate(counts)
+        }
+        if "a" in cols:
+            a, b, c, d = cols["a"], cols["b"], cols["c"], cols["d"]
+            cols = {"x1": a, "n1": a + b, "x2": c, "n2": c + d}
+        yield cols
+
+
+def _format(value: float) -> str:
+    return "NA" if value != value else repr(value)
+
+
+def test_tables_main(args: argparse.Namespace) -> int:
+    from ._batch import boschloo_many, uncondExact2x2_many
+    from ._result import BATCH_FIELDS
+
+    infile = sys.stdin if args.input == "-" else open(args.input, newline="")
+    try:
+        header_line = infile.readline()
+        delimiter = args.delimiter or ("\t" if "\t" in header_line else ",")
+        header = next(csv.reader([header_line], delimiter=delimiter))
+        names = args.cells or args.columns
+        if len(names) != 4:
+            print("Need four column names, got %s" % names, file=sys.stderr)
+            return 2
+        missing = [k for k in names if k not in header]
+        if missing:
+            print("Columns %s not found in the header" % missing, file=sys.stderr)
+            return 2
+        keys = ("a", "b", "c", "d") if args.cells else ("x1", "n1", "x2", "n2")
+        counts = {k: header.index(name) for k, name in zip(keys, names)}
+
+        keep = _UNCOND_OPTIONS + ("conf_int", "conf_level")
+        if args.test == "boschloo":
+            keep = _BOSCHLOO_OPTIONS
+        options = {k: getattr(args, k) for k in keep}
+        rows = deque()
+        chunks = _read_chunks(csv.reader(infile, delimiter=delimiter), counts, args.chunksize, rows)
+        if args.workers > 1:
+            from ._pool import Pool
+
+            pool = Pool(workers=args.workers)
+            results = pool.imap_chunks(chunks, test=args.test, **options)
+        else:
+            pool = None
+            func = boschloo_many if args.test == "boschloo" else uncondExact2x2_many
+            results = (func(**dict(options, **cols)) for cols in chunks)
+
+        try:
+            writer = csv.writer(sys.stdout, delimiter=delimiter, lineterminator="\n")
+            writer.writerow(header + [name for name, _ in BATCH_FIELDS])
+            for res in results:
+                chunk = rows.popleft()
+                for row, values in zip(chunk, res.data.T.tolist()):
+                    writer.writerow(row + [_format(v) for v in values])
+                sys.stdout.flush()
+        except _InputError as e:
+            print(e, file=sys.stderr)
+            return 2
+        finally:
+            if pool is not None:
+                pool.terminate()
+    finally:
+        if infile is not sys.stdin:
+            infile.close()
+    return 0
+
+
+def build_store_main(args: argparse.Namespace) -> int:
+    from ._store import _designs, build_store
+
+    options = {k: getattr(args, k) for k in _UNCOND_OPTIONS}
+    store = build_store(args.path, args.n1, args.n2, canonical=args.canonical, **options)
+    designs = _designs(args.n1, args.n2, args.canonical)
+    print("Built %d designs into %s" % (len(designs), store.path), file=sys.stderr)
+    return 0
+
+
+def daemon_main(args: argparse.Namespace) -> int:
+    import signal
+
+    from ._daemon import Daemon
+
+    # Leave serve_forever through the finally clause on SIGTERM too.
+    signal.signal(signal.SIGTERM, lambda *_: sys.exit(0))
+    with Daemon(args.socket, args.workers) as daemon:
+        print("Listening on %s with %d workers" % (daemon.path, daemon.workers), file=sys.stderr)
+        try:
+            daemon.serve_forever()
+        except KeyboardInterrupt:
+            pass
+    return 0
+
+
+def make_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="pyrexact2x2", description=__doc__)
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    build = commands.add_parser(
+        "build-store", help="Precompute p-value matrices of uncondExact2x2 for fixed designs"
+    )
+    build.add_argument("path", help="Store directory")
+    build.add_argument("--n1", type=_int_range, required=True, help="Group 1 sizes, e.g. 1:500")
+    build.add_argument("--n2", type=_int_range, required=True, help="Group 2 sizes, e.g. 1:500")
+    build.add_argument(
+        "--canonical",
+        action="store_true",
+        help="Store only designs with n1 <= n2 and answer the others by exchanging the groups",
+    )
+    _add_uncond_options(build)
+    build.set_defaults(func=build_store_main)
+
+    test = commands.add_parser(
+        "test",
+        help="Test 2x2 tables read from CSV or TSV, streaming the results to stdout",
+        description="Reads tables one per row from a CSV or TSV file with a header and writes "
+        "the rows back with the columns p.value, conf.int.low, conf.int.high and estimate "
+        "added. Input is processed in chunks, so memory use does not grow with its length.",
+    )
+    test.add_argument("input", nargs="?", default="-", help="Input file, default stdin")
+    test.add_argument("--test", choices=("uncondExact2x2", "boschloo"), default="uncondExact2x2")
+    test.add_argument(
+        "--columns",
+        type=lambda s: s.split(","),
+        default=["x1", "n1", "x2", "n2"],
+        help="Header names of x1, n1, x2 and n2, default x1,n1,x2,n2",
+    )
+    test.add_argument(
+        "--cells",
+        type=lambda s: s.split(","),
+        default=None,
+        help="Alternatively, header names of the four cells: group 1 events, group 1 "
+        "non-events, group 2 events and group 2 non-events",
+    )
+    test.add_argument("--delimiter", default=None, help="Field delimiter, detected by default")
+    test.add_argument("--chunksize", type=int, default=10000, help="Tables per batch")
+    test.add_argument("--workers", type=int, default=1, help="Worker processes")
+    _add_uncond_options(test)
+    test.add_argument("--OR", type=float, default=1.0, help="Null odds ratio of boschloo")
+    test.add_argument("--conf_int", type=_bool, default=False)
+    test.add_argument("--conf_level", type=float, default=0.95)
+    test.set_defaults(func=test_tables_main)
+
+    daemon = commands.add_parser(
+        "daemon",
+        help="Keep R loaded in worker processes and serve the R calls of other processes",
+        description="Listens on a Unix domain socket. Processes using the R engine forward "
+        "their calls to it while its socket exists, saving the R start up time.",
+    )
+    daemon.add_argument(
+        "--socket",
+        default=None,
+        help="Socket path, default $XDG_RUNTIME_DIR/pyrexact2x2-<uid>.sock or "
+        "pyrexact2x2-<uid>/daemon.sock in the temporary directory",
+    )
+    daemon.add_argument("--workers", type=int, default=1, help="Worker processes")
+    daemon.set_defaults(func=daemon_main)
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = make_parser().parse_args(argv)
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
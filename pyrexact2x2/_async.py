@@ -0,0 +1,153 @@
+"""asyncio interface running the tests on a pool of worker processes.
+
+The event loop only submits work and awaits its completion, so a coroutine
+calling ``await uncondExact2x2_async(...)`` does not block other requests.
+Concurrency is bounded: at most ``max_pending`` calls or batch chunks are
+submitted to the workers at a time and further callers wait for a free slot,
+which applies back-pressure instead of growing an unbounded queue.
+"""
+import asyncio
+import multiprocessing
+import os
+import threading
+import weakref
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from typing import Dict, Optional
+
+from ._pool import _init_worker, _run_chunk, _tasks
+from ._result import BatchResult, Result
+
+
+def _call(test: str, args, kwargs) -> Result:
+    from . import boschloo, uncondExact2x2
+
+    return {"uncondExact2x2": uncondExact2x2, "boschloo": boschloo}[test](*args, **kwargs)
+
+
+class AsyncPool:
+    """Worker processes serving async test calls.
+
+    Args:
+        workers: Number of worker processes. Defaults to ``os.cpu_count()``.
+        max_pending: Maximum number of calls or batch chunks submitted to the
+            workers at a time. Defaults to twice the number of workers.
+        chunksize: Tables per chunk of the batch functions. When None, each
+            batch is split into about four chunks per worker.
+        warmup: Start R in each worker when it starts. Set to False when
+            only the numpy engine is used.
+        context: multiprocessing start method, "spawn" as for ``Pool``.
+
+    The pool is an async context manager::
+
+        async with pyrexact2x2.AsyncPool(workers=4) as pool:
+            res = await pool.boschloo(1, 5, 0, 6)
+    """
+
+    def __init__(
+        self,
+        workers: Optional[int] = None,
+        max_pending: Optional[int] = None,
+        chunksize: Optional[int] = None,
+        warmup: bool = True,
+        context: str = "spawn",
+    ):
+        self.workers = workers or os.cpu_count() or 1
+        self.max_pending = max_pending or 2 * self.workers
+        self.chunksize = chunksize
+        self._executor = ProcessPoolExecutor(
+            self.workers,
+            mp_context=multiprocessing.get_context(context),
+            initializer=_init_worker if warmup else None,
+        )
+        # Semaphores belong to an event loop; keep one per loop using the pool.
+        self._semaphores = weakref.WeakKeyDictionary()
+
+    def _semaphore(self) -> asyncio.Semaphore:
+        loop = asyncio.get_running_loop()
+        if loop not in self._semaphores:
+            self._semaphores[loop] = asyncio.Semaphore(self.max_pending)
+        return self._semaphores[loop]
+
+    async def _submit(self, func, *args):
+        async with self._semaphore():
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._executor, partial(func, *args))
+
+    async def uncondExact2x2(self, *args, **kwargs) -> Result:
+        "``pyrexact2x2.uncondExact2x2`` on a worker."
+        return await self._submit(_call, "uncondExact2x2", args, kwargs)
+
+    async def boschloo(self, *args, **kwargs) -> Result:
+        "``pyrexact2x2.boschloo`` on a worker."
+        return await self._submit(_call, "boschloo", args, kwargs)
+
+    async def _many(self, test: str, x1, n1, x2, n2, chunksize, options: Dict) -> BatchResult:
+        chunksize = chunksize or self.chunksize
+        tasks = _tasks(test, x1, n1, x2, n2, chunksize, self.workers, options)
+        parts = await asyncio.gather(*[self._submit(_run_chunk, task) for task in tasks])
+        return BatchResult.concatenate(res for _, res in parts)
+
+    async def uncondExact2x2_many(
+        self, x1, n1, x2, n2, chunksize: Optional[int] = None, **options
+    ) -> BatchResult:
+        "``pyrexact2x2.uncondExact2x2_many`` split into chunks over the workers."
+        return await self._many("uncondExact2x2", x1, n1, x2, n2, chunksize, options)
+
+    async def boschloo_many(
+        self, x1, n1, x2, n2, chunksize: Optional[int] = None, **options
+    ) -> BatchResult:
+        "``pyrexact2x2.boschloo_many`` split into chunks over the workers."
+        return await self._many("boschloo", x1, n1, x2, n2, chunksize, options)
+
+    def close(self, wait: bool = True) -> None:
+        self._executor.shutdown(wait=wait)
+
+    async def __aenter__(self) -> "AsyncPool":
+        return self
+
+    async def __aexit__(self, *exc) -> None:
+        await asyncio.get_running_loop().run_in_executor(None, self.close)
+
+
+_default: Optional[AsyncPool] = None
+_default_lock = threading.Lock()
+
+
+def get_async_pool() -> AsyncPool:
+    """The pool behind the module level async functions, started on first
+    use. Its workers start R on their first R call, so that the numpy engine
+    works without R."""
+    global _default
+    with _default_lock:
+        if _default is None:
+            _default = AsyncPool(warmup=False)
+        return _default
+
+
+def set_async_pool(pool: Optional[AsyncPool]) -> None:
+    """Replace the pool behind the module level async functions, e.g. by one
+    with other limits. The previous pool is not closed."""
+    global _default
+    with _default_lock:
+        _default = pool
+
+
+async def uncondExact2x2_async(*args, **kwargs) -> Result:
+    "Awaitable ``uncondExact2x2`` running on the pool of ``get_async_pool()``."
+    return await get_async_pool().uncondExact2x2(*args, **kwargs)
+
+
+async def boschloo_async(*args, **kwargs) -> Result:
+    "Awaitable ``boschloo`` running on the pool of ``get_async_pool()``."
+    return await get_async_pool().boschloo(*args, **kwargs)
+
+
+async def uncondExact2x2_many_async(x1, n1, x2, n2, **kwargs) -> BatchResult:
+    "Awaitable ``uncondExact2x2_many`` running on the pool of ``get_async_pool()``."
+    return await get_async_pool().uncondExact2x2_many(x1, n1, x2, n2, **kwargs)
+
+
+async def boschloo_many_async(x1, n1, x2, n2, **kwargs) -> BatchResult:
+    "Awaitable ``boschloo_many`` running on the pool of ``get_async_pool()``."
+    return await get_async_pool().boschloo_many(x1, n1, x2, n2, **kwargs)
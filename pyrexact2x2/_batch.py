@@ -0,0 +1,277 @@
+"""Batch evaluation of many 2x2 tables in a single R round-trip."""
+import threading
+from collections import namedtuple
+from logging import warning
+from typing import Dict, Tuple
+
+import numpy as np
+
+from . import _instrument
+from ._result import BatchResult
+from ._session import BATCH_COLUMNS, get_session
+
+
+def _column(values) -> np.ndarray:
+    """A column as a NumPy array. NumPy arrays, pandas and Arrow columns
+    (e.g. of a table read from Parquet) are taken without converting their
+    elements to Python objects; Arrow arrays without nulls are not copied."""
+    values = np.asarray(values)
+    if values.dtype == object and all(isinstance(v, str) for v in values.flat):
+        # Strings, e.g. from Arrow, as fixed width so they sort and compare.
+        values = values.astype(str)
+    return values
+
+
+def _broadcast(**columns) -> Dict[str, np.ndarray]:
+    "Broadcast scalar or per-row columns to 1-D arrays of common length."
+    names = list(columns)
+    arrays = np.broadcast_arrays(*[_column(columns[k]) for k in names])
+    return {k: np.ravel(a) for k, a in zip(names, arrays)}
+
+
+def _to_r_vector(values: np.ndarray):
+    """Copy a column into an R vector from its memory buffer, without Python
+    objects per element. Strings go through a list, but option columns are
+    usually constant and shipped with length one."""
+    from rpy2 import rinterface, robjects
+
+    kind = values.dtype.kind
+    if kind in "biu":
+        # R stores integers and logicals as 32 bit integers.
+        vector = rinterface.BoolSexpVector if kind == "b" else rinterface.IntSexpVector
+        data = values.astype(np.int32, copy=False)
+    elif kind == "f":
+        vector, data = rinterface.FloatSexpVector, values.astype(np.float64, copy=False)
+    else:
+        return robjects.StrVector([str(v) for v in values])
+    if not hasattr(vector, "from_memoryview"):  # rpy2 < 3.0
+        python_vector = {"b": robjects.BoolVector, "f": robjects.FloatVector}
+        return python_vector.get(kind, robjects.IntVector)(values.tolist())
+    return vector.from_memoryview(memoryview(np.ascontiguousarray(data)))
+
+
+def _from_r_matrix(out, m: int) -> np.ndarray:
+    "The (m, 4) R result matrix as a (4, m) array, copied from its buffer."
+    try:
+        # R matrices are stored in column major order, so the flat buffer
+        # holds one result column after the other.
+        flat = np.asarray(out.memoryview()).ravel(order="K")
+    except AttributeError:  # rpy2 < 3.0
+        flat = np.fromiter(out, dtype=float, count=m * len(BATCH_COLUMNS))
+    return np.array(flat, dtype=float).reshape(len(BATCH_COLUMNS), m)
+
+
+def _option_vector(values: np.ndarray):
+    "Ship an option column to R, collapsing constant columns to length one."
+    if len(values) > 0 and np.all(values == values[0]):
+        values = values[:1]
+    return _to_r_vector(values)
+
+
+def _check_counts(cols: Dict[str, np.ndarray]) -> None:
+    "Cast the count columns to integers and check that they form 2x2 tables."
+    for k in ("x1", "n1", "x2", "n2"):
+        cols[k] = cols[k].astype(np.int64, copy=False)
+    assert np.all((0 <= cols["x1"]) & (cols["x1"] <= cols["n1"])), "Need 0 <= x1 <= n1"
+    assert np.all((0 <= cols["x2"]) & (cols["x2"] <= cols["n2"])), "Need 0 <= x2 <= n2"
+
+
+def _uncond_options(cols: Dict[str, np.ndarray]) -> Dict[str, np.ndarray]:
+    """Resolve the defaults of the ``uncondExact2x2`` ordering options like the
+    scalar function does, keyed by their R argument names."""
+    nullparm = cols["nullparm"].astype(float)
+    missing = np.isnan(nullparm)
+    nullparm[missing] = np.where(cols["parmtype"][missing] == "difference", 0.0, 1.0)
+
+    tiebreak = cols["tiebreak"].astype(bool)
+    ignored = tiebreak & (cols["method"] != "simple")
+    if np.any(ignored):
+        warning("Ignoring tiebreak for %d tables with method != simple", ignored.sum())
+        tiebreak = tiebreak & ~ignored
+
+    return {
+        "parmtype": cols["parmtype"],
+        "nullparm": nullparm,
+        "alternative": cols["alternative"],
+        "method": cols["method"],
+        "tsmethod": cols["tsmethod"],
+        "midp": cols["midp"].astype(bool),
+        "gamma": cols["gamma"].astype(float),
+        "EplusM": cols["EplusM"].astype(bool),
+        "tiebreak": tiebreak,
+    }
+
+
+BatchInfo = namedtuple("BatchInfo", ["batches", "tables", "unique", "ratio"])
+
+_info_lock = threading.Lock()
+_batches = _tables = _unique = 0
+
+
+def batch_info() -> BatchInfo:
+    """Number of batches and of tables passed to R by the batch functions of
+    this process, the number of distinct (table, options) rows among them, and
+    the deduplication ratio, tables per distinct row."""
+    with _info_lock:
+        ratio = _tables / _unique if _unique else 1.0
+        return BatchInfo(_batches, _tables, _unique, ratio)
+
+
+def batch_info_clear() -> None:
+    global _batches, _tables, _unique
+    with _info_lock:
+        _batches = _tables = _unique = 0
+
+
+def _distinct(
+    cols: Dict[str, np.ndarray], options: Dict[str, np.ndarray]
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Rows of the first occurrence of each distinct (table, options) row and
+    the position of every row among them."""
+    keys = [cols[k] for k in ("x1", "n1", "x2", "n2")] + list(options.values())
+    _, first, inverse = np.unique(np.rec.fromarrays(keys), return_index=True, return_inverse=True)
+    return first, inverse.ravel()
+
+
+def _run_batch(
+    test: str, cols: Dict[str, np.ndarray], options: Dict[str, np.ndarray]
+) -> BatchResult:
+    global _batches, _tables, _unique
+
+    if len(cols["x1"]) == 0:
+        return BatchResult.empty()
+    # Identical rows are computed once and their results scattered back.
+    first, inverse = _distinct(cols, options)
+    with _info_lock:
+        _batches += 1
+        _tables += len(inverse)
+        _unique += len(first)
+    if len(first) < len(inverse):
+        cols = {k: v[first] for k, v in cols.items()}
+        options = {k: v[first] for k, v in options.items()}
+    m = len(first)
+    function = test + "_many"
+
+    from . import _daemon
+
+    remote = _daemon.forward("batch", test, cols, options)
+    if remote is not None:
+        out = np.array(remote, dtype=float)
+    else:
+        out = _compute_batch(function, cols, options, m)
+    if m < len(inverse):
+        out = out[:, inverse]
+    return BatchResult(out)
+
+
+def _compute_batch(
+    function: str, cols: Dict[str, np.ndarray], options: Dict[str, np.ndarray], m: int
+) -> np.ndarray:
+    "Evaluate a batch in the R session of this process."
+    from rpy2 import robjects
+
+    test = function[: -len("_many")]
+    with _instrument.phase(function, "batch", "R", "import"):
+        session = get_session().init()
+    with _instrument.phase(function, "batch", "R", "convert_in"):
+        args = robjects.ListVector([(k, _option_vector(v)) for k, v in options.items()])
+        counts = [_to_r_vector(cols[k]) for k in ("x1", "n1", "x2", "n2")]
+    with _instrument.phase(function, "batch", "R", "compute"):
+        out = session.batch(test, *counts, args)
+    with _instrument.phase(function, "batch", "R", "convert_out"):
+        return _from_r_matrix(out, m)
+
+
+def uncondExact2x2_many(
+    x1,
+    n1,
+    x2,
+    n2,
+    parmtype="difference",
+    nullparm=None,
+    alternative="two.sided",
+    conf_level=0.95,
+    method="FisherAdj",
+    tsmethod="central",
+    midp=False,
+    gamma=0.0,
+    EplusM=False,
+    tiebreak=False,
+    conf_int=False,
+) -> BatchResult:
+    """Unconditional exact tests for arrays of 2x2 tables.
+
+    Takes the same arguments as ``uncondExact2x2`` but every argument may be
+    either a scalar or an array with one value per table, e.g. a NumPy array,
+    a pandas column or an Arrow column of a table read from Parquet. All
+    tables are evaluated in a single R call, and numeric columns are copied
+    to and from R through their memory buffers.
+
+    Returns:
+        BatchResult: Columns ``p.value``, ``conf.int.low``, ``conf.int.high``
+        and ``estimate`` with one element per table. The interval bounds are
+        NaN unless ``conf_int`` is set.
+    """
+    cols = _broadcast(
+        x1=x1,
+        n1=n1,
+        x2=x2,
+        n2=n2,
+        parmtype=parmtype,
+        nullparm=np.nan if nullparm is None else nullparm,
+        alternative=alternative,
+        conf_level=conf_level,
+        method=method,
+        tsmethod=tsmethod,
+        midp=midp,
+        gamma=gamma,
+        EplusM=EplusM,
+        tiebreak=tiebreak,
+        conf_int=conf_int,
+    )
+    _check_counts(cols)
+    options = _uncond_options(cols)
+    options["conf.int"] = cols["conf_int"].astype(bool)
+    options["conf.level"] = cols["conf_level"].astype(float)
+    return _run_batch("uncondExact2x2", cols, options)
+
+
+def boschloo_many(
+    x1,
+    n1,
+    x2,
+    n2,
+    alternative="two.sided",
+    OR=1.0,
+    conf_int=False,
+    conf_level=0.95,
+    midp=False,
+    tsmethod="central",
+) -> BatchResult:
+    """Boschloo's tests for arrays of 2x2 tables in a single R call.
+
+    Arguments and return value are as in ``uncondExact2x2_many``; the
+    confidence intervals are for the odds ratio.
+    """
+    cols = _broadcast(
+        x1=x1,
+        n1=n1,
+        x2=x2,
+        n2=n2,
+        alternative=alternative,
+        OR=OR,
+        conf_int=conf_int,
+        conf_level=conf_level,
+        midp=midp,
+        tsmethod=tsmethod,
+    )
+    _check_counts(cols)
+    options = {
+        "alternative": cols["alternative"],
+        "or": cols["OR"].astype(float),
+        "conf.int": cols["conf_int"].astype(bool),
+        "conf.level": cols["conf_level"].astype(float),
+        "midp": cols["midp"].astype(bool),
+        "tsmethod": cols["tsmethod"],
+    }
+    return _run_batch("boschloo", cols, options)
@@ -0,0 +1,273 @@
+"""Opt-in memoisation of test results.
+
+Results are keyed on the test name, the table and every option of the test,
+so two calls share an entry only if R would compute the same result for them.
+Caching is off until ``enable_cache()`` is called.
+"""
+import json
+import os
+import threading
+from collections import OrderedDict, namedtuple
+from typing import TYPE_CHECKING, Dict, Hashable, Optional
+
+from ._result import Result
+
+if TYPE_CHECKING:
+    import sqlite3
+
+# Layout of the stored keys and values, part of the version tag of disk caches.
+_DISK_FORMAT = 3
+
+CacheInfo = namedtuple("CacheInfo", ["hits", "misses", "evictions", "maxsize", "currsize"])
+
+
+class LRUCache:
+    """Bounded in-memory cache evicting the least recently used entry.
+
+    Args:
+        maxsize: Maximum number of stored results.
+    """
+
+    def __init__(self, maxsize: int = 65536):
+        assert maxsize > 0, "Cache size must be positive"
+        self.maxsize = maxsize
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = self.misses = self.evictions = 0
+
+    def get(self, key: Hashable) -> Optional[Dict]:
+        with self._lock:
+            try:
+                value = self._data[key]
+            except KeyError:
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key: Hashable, value: Dict) -> None:
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+            self.hits = self.misses = self.evictions = 0
+
+    def info(self) -> CacheInfo:
+        with self._lock:
+            return CacheInfo(self.hits, self.misses, self.evictions, self.maxsize, len(self._data))
+
+
+def _plain(key):
+    """``key`` with NumPy scalars as Python numbers and integral numbers as
+    ints, so that keys equal in a dict, such as 1, 1.0 and np.int64(1), have
+    the same JSON encoding."""
+    if isinstance(key, (tuple, list)):
+        return [_plain(k) for k in key]
+    if hasattr(key, "item"):
+        key = key.item()
+    if isinstance(key, float) and key.is_integer():
+        return int(key)
+    if isinstance(key, bool):
+        return int(key)
+    return key
+
+
+def package_versions() -> str:
+    "Version tag of the code computing the results: pyrexact2x2 and exact2x2."
+    from . import __version__
+    from ._session import get_session
+
+    return "pyrexact2x2=%s;exact2x2=%s" % (__version__, get_session().exact2x2_version())
+
+
+class DiskCache:
+    """Persistent cache of results in an SQLite file.
+
+    The file is opened in WAL mode so that several processes can read and
+    write it concurrently. Each connection belongs to one thread of one
+    process. Entries written by other versions of pyrexact2x2 or exact2x2 are
+    dropped when the file is opened.
+
+    Args:
+        path: SQLite database file, created if missing.
+        version: Version tag of the results. Defaults to
+            ``package_versions()``, which starts R to query exact2x2.
+        timeout: Seconds to wait for a lock held by another process.
+    """
+
+    def __init__(self, path: str, version: Optional[str] = None, timeout: float = 60.0):
+        self.path = path
+        self.version = version if version is not None else package_versions()
+        self.timeout = timeout
+        self._local = threading.local()
+        self.hits = self.misses = 0
+        self._check_version()
+
+    def _connection(self) -> "sqlite3.Connection":
+        conn = getattr(self._local, "conn", None)
+        if conn is None or self._local.pid != os.getpid():
+            import sqlite3
+
+            conn = sqlite3.connect(self.path, timeout=self.timeout, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("CREATE TABLE IF NOT EXISTS meta (name TEXT PRIMARY KEY, value TEXT)")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS results (key TEXT PRIMARY KEY, value TEXT NOT NULL)"
+            )
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    def _check_version(self) -> None:
+        conn = self._connection()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = conn.execute("SELECT value FROM meta WHERE name = 'version'").fetchone()
+            tag = "%s;format=%d" % (self.version, _DISK_FORMAT)
+            if row is None or row[0] != tag:
+                conn.execute("DELETE FROM results")
+                conn.execute(
+                    "INSERT OR REPLACE INTO meta (name, value) VALUES ('version', ?)",
+                    (tag,),
+                )
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+
+    @staticmethod
+    def _encode(key: Hashable) -> str:
+        return json.dumps(_plain(key))
+
+    @staticmethod
+    def _encode_value(value) -> str:
+        if isinstance(value, Result):
+            return json.dumps({"Result": value.astuple()})
+        return json.dumps(value)
+
+    @staticmethod
+    def _decode_value(text: str):
+        value = json.loads(text)
+        if isinstance(value, dict) and list(value) == ["Result"]:
+            return Result(*value["Result"])
+        return value
+
+    def get(self, key: Hashable) -> Optional[Dict]:
+        row = (
+            self._connection()
+            .execute("SELECT value FROM results WHERE key = ?", (self._encode(key),))
+            .fetchone()
+        )
+        if row is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return self._decode_value(row[0])
+
+    def put(self, key: Hashable, value: Dict) -> None:
+        self._connection().execute(
+            "INSERT OR REPLACE INTO results (key, value) VALUES (?, ?)",
+            (self._encode(key), self._encode_value(value)),
+        )
+
+    def clear(self) -> None:
+        self._connection().execute("DELETE FROM results")
+        self.hits = self.misses = 0
+
+    def info(self) -> CacheInfo:
+        (size,) = self._connection().execute("SELECT COUNT(*) FROM results").fetchone()
+        return CacheInfo(self.hits, self.misses, 0, None, size)
+
+
+_cache: Optional[LRUCache] = None
+_disk: Optional[DiskCache] = None
+_canonical = False
+
+
+def enable_cache(
+    maxsize: int = 65536,
+    path: Optional[str] = None,
+    disk: Optional[DiskCache] = None,
+    canonical: bool = False,
+) -> LRUCache:
+    """Start memoising ``uncondExact2x2`` and ``boschloo`` results.
+
+    Args:
+        maxsize: Maximum number of results kept in memory.
+        path: Optional SQLite file for a persistent ``DiskCache`` behind the
+            in-memory cache, shared across processes and runs.
+        disk: Alternatively an already opened ``DiskCache``.
+        canonical: Map each table to a canonical form under exchanging the
+            groups and successes with failures before the lookup, so that
+            equivalent tables share an entry. Their results agree with direct
+            calls up to the accuracy of the grid search over the nuisance
+            parameter.
+
+    Returns:
+        LRUCache: The active in-memory cache.
+    """
+    global _cache, _disk, _canonical
+    if disk is None and path is not None:
+        disk = DiskCache(path)
+    _cache = LRUCache(maxsize)
+    _disk = disk
+    _canonical = canonical
+    return _cache
+
+
+def disable_cache() -> None:
+    "Stop memoising and drop all in-memory results. Disk caches are kept."
+    global _cache, _disk, _canonical
+    _cache = None
+    _disk = None
+    _canonical = False
+
+
+def canonical() -> bool:
+    "Whether tables are mapped to their canonical forms before the cache lookup."
+    return _canonical
+
+
+def cache_info() -> Optional[CacheInfo]:
+    "Hit, miss and eviction counts of the active cache, None if caching is off."
+    return None if _cache is None else _cache.info()
+
+
+def disk_cache_info() -> Optional[CacheInfo]:
+    "Hit and miss counts and size of the active disk cache, None if there is none."
+    return None if _disk is None else _disk.info()
+
+
+def cache_clear() -> None:
+    "Drop all cached results, including the disk cache, and reset the statistics."
+    if _cache is not None:
+        _cache.clear()
+    if _disk is not None:
+        _disk.clear()
+
+
+def lookup(key: Hashable) -> Optional[Result]:
+    "Return a copy of the cached result for ``key``, None on a miss."
+    if _cache is None:
+        return None
+    value = _cache.get(key)
+    if value is None and _disk is not None:
+        value = _disk.get(key)
+        if value is not None:
+            _cache.put(key, value)
+    return None if value is None else value.copy()
+
+
+def store(key: Hashable, value: Result) -> None:
+    if _cache is not None:
+        _cache.put(key, value.copy())
+        if _disk is not None:
+            _disk.put(key, value)
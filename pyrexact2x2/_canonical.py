@@ -0,0 +1,138 @@
+"""Canonical forms of 2x2 tables under the symmetries of the tests.
+
+Exchanging the groups, (x1, n1) <-> (x2, n2), or successes and failures,
+x -> n - x, maps a test onto an equivalent one with the alternative reversed
+and the parameter negated (difference) or inverted (ratio, odds ratio). Doing
+both leaves a difference or odds ratio unchanged. The p-value is the same for
+all forms, so a cache only needs to hold one canonical representative of
+each class, and the result of any other form follows by transforming the
+estimate, confidence interval and descriptive fields.
+
+The forms agree exactly in theory; numerically they agree up to the accuracy
+of the grid search over the nuisance parameter.
+"""
+from typing import Optional, Tuple
+
+from ._result import Result
+
+_FLIP_ALTERNATIVE = {"less": "greater", "greater": "less"}
+_ALTERNATIVE_RANK = {"two.sided": 0, "less": 1, "greater": 2}
+
+
+def _invert(value: float) -> float:
+    if value == 0:
+        return float("inf")
+    return 1.0 / value
+
+
+class Symmetry:
+    """One of the maps between a table and its canonical form.
+
+    Args:
+        swap: Exchange the groups.
+        flip: Exchange successes and failures.
+        parmtype: Parameter of the test, "difference", "ratio" or "oddsratio".
+
+    Each map is its own inverse, so the same object maps the canonical form
+    back to the original one.
+    """
+
+    __slots__ = ("swap", "flip", "parmtype")
+
+    def __init__(self, swap: bool, flip: bool, parmtype: str):
+        self.swap = swap
+        self.flip = flip
+        self.parmtype = parmtype
+
+    @property
+    def reverses(self) -> bool:
+        "Whether the direction of the parameter is reversed."
+        return self.swap != self.flip
+
+    def table(self, x1: int, n1: int, x2: int, n2: int) -> Tuple[int, int, int, int]:
+        if self.flip:
+            x1, x2 = n1 - x1, n2 - x2
+        if self.swap:
+            x1, n1, x2, n2 = x2, n2, x1, n1
+        return x1, n1, x2, n2
+
+    def parameter(self, value: float) -> float:
+        if not self.reverses:
+            return value
+        if self.parmtype == "difference":
+            return 0.0 - value
+        return _invert(value)
+
+    def alternative(self, alternative: str) -> str:
+        if not self.reverses:
+            return alternative
+        return _FLIP_ALTERNATIVE.get(alternative, alternative)
+
+    def restore(
+        self, res: Result, x1: int, n1: int, x2: int, n2: int, null_value: float, alternative: str
+    ) -> Result:
+        """The result for the original table (x1, n1, x2, n2) from the result
+        ``res`` of its canonical form."""
+        out = res.copy()
+        out.statistic = x1 / n1
+        out.parameter = x2 / n2
+        out.estimate = self.parameter(res.estimate)
+        low, high = self.parameter(res.ci_low), self.parameter(res.ci_high)
+        out.ci_low, out.ci_high = (high, low) if self.reverses else (low, high)
+        out.null_value = null_value
+        out.alternative = alternative
+        out.data_name = "x1/n1=(%d/%d) and x2/n2= (%d/%d)" % (x1, n1, x2, n2)
+        return out
+
+
+def canonical(
+    x1: int,
+    n1: int,
+    x2: int,
+    n2: int,
+    parmtype: str,
+    null_value: float,
+    alternative: str,
+    swap: bool = True,
+    flip: bool = True,
+) -> Tuple[Symmetry, Tuple[int, int, int, int], float, str]:
+    """The canonical form of a test among those reachable with the allowed maps.
+
+    The canonical form is the one with the smallest (n1, n2, x1, x2,
+    alternative, null value), so every member of a class maps to the same
+    representative up to rounding of the null value.
+
+    Returns:
+        tuple: (symmetry, table, null value, alternative) of the canonical form.
+    """
+    best, best_key = None, None
+    for s in (False, True) if swap else (False,):
+        for f in (False, True) if flip else (False,):
+            sym = Symmetry(s, f, parmtype)
+            a1, m1, a2, m2 = sym.table(x1, n1, x2, n2)
+            alt = sym.alternative(alternative)
+            key = (m1, m2, a1, a2, _ALTERNATIVE_RANK.get(alt, 3), sym.parameter(null_value))
+            if best_key is None or key < best_key:
+                best, best_key = sym, key
+    table = best.table(x1, n1, x2, n2)
+    return best, table, best.parameter(null_value), best.alternative(alternative)
+
+
+def uncond_symmetries(
+    parmtype: str, method: str, gamma: float, tiebreak: bool
+) -> Optional[Tuple[bool, bool]]:
+    """Which of (swap, flip) preserve an ``uncondExact2x2`` test, None if
+    neither is known to.
+
+    The built-in orderings reverse under both maps. The ratio is preserved
+    only by exchanging the groups. User supplied statistics, the Berger-Boos
+    adjustment, tie breaking and abbreviated parmtypes such as "diff", which
+    R matches partially, are left alone.
+    """
+    if method in ("user", "user-fixed") or gamma > 0 or tiebreak:
+        return None
+    if parmtype == "ratio":
+        return True, False
+    if parmtype in ("difference", "oddsratio"):
+        return True, True
+    return None
@@ -0,0 +1,97 @@
+"""Settings of the numerical searches, mirroring exact2x2::ucControl."""
+from typing import Dict, Optional, Tuple
+
+_DEFAULTS = {
+    "nPgrid": 100,
+    "nCIgrid": 500,
+    "errbound": 1e-6,
+    "adaptive": False,
+    "ptol": 1e-6,
+    "maxPgrid": 3200,
+}
+
+# Settings understood by exact2x2::ucControl; the rest are handled in Python.
+_R_KEYS = ("nPgrid", "nCIgrid", "errbound")
+
+
+def ucControl(
+    nPgrid: int = 100,
+    nCIgrid: int = 500,
+    errbound: float = 1e-6,
+    adaptive: bool = False,
+    ptol: float = 1e-6,
+    maxPgrid: int = 3200,
+) -> Dict:
+    """Control settings for ``uncondExact2x2`` and ``boschloo``.
+
+      nPgrid: number of grid points over the nuisance parameter when
+              maximising the p-value
+
+     nCIgrid: number of grid points when searching confidence limits
+
+    errbound: error bound of the confidence limit search
+
+    adaptive: refine the p-value search until it stabilises within ``ptol``
+              instead of using one fixed grid. The numpy engine starts from a
+              grid of nPgrid points and refines only around its local maxima;
+              the R engine doubles nPgrid, up to maxPgrid, until successive
+              p-values agree. A small nPgrid with adaptive=True trades accuracy
+              for speed in a controlled way.
+
+        ptol: absolute tolerance of the adaptive search
+
+    maxPgrid: largest nPgrid tried by the adaptive R search
+    """
+    return {
+        "nPgrid": int(nPgrid),
+        "nCIgrid": int(nCIgrid),
+        "errbound": float(errbound),
+        "adaptive": bool(adaptive),
+        "ptol": float(ptol),
+        "maxPgrid": int(maxPgrid),
+    }
+
+
+def resolve(control: Optional[Dict]) -> Dict:
+    "Complete a partial control dict with the defaults."
+    if control is None:
+        return dict(_DEFAULTS)
+    unknown = set(control) - set(_DEFAULTS)
+    if unknown:
+        raise TypeError("Unknown control settings %s" % sorted(unknown))
+    return ucControl(**dict(_DEFAULTS, **control))
+
+
+def key(control: Optional[Dict]) -> Optional[Tuple]:
+    "Hashable form of the settings for cache keys; None for the defaults."
+    control = resolve(control)
+    if control == _DEFAULTS:
+        return None
+    return tuple(sorted(control.items()))
+
+
+def r_control(control: Dict, **overrides):
+    "The settings as an R ucControl object."
+    from ._session import get_session
+
+    settings = {k: control[k] for k in _R_KEYS}
+    settings.update(overrides)
+    return get_session().exact2x2.ucControl(**settings)
+
+
+def call_r(func, args: Tuple, control: Optional[Dict]):
+    """Call an exact2x2 test with the control settings, repeating it on finer
+    grids when the settings ask for an adaptive search."""
+    if control is None:
+        return func(*args)
+    control = resolve(control)
+    res = func(*args, control=r_control(control))
+    npgrid = control["nPgrid"]
+    while control["adaptive"] and 2 * npgrid <= control["maxPgrid"]:
+        npgrid *= 2
+        finer = func(*args, control=r_control(control, nPgrid=npgrid))
+        change = abs(finer.rx2("p.value")[0] - res.rx2("p.value")[0])
+        res = finer
+        if change <= control["ptol"]:
+            break
+    return res
@@ -0,0 +1,390 @@
+"""Local daemon keeping R warm between processes.
+
+Starting embedded R and loading exact2x2 takes seconds, which dominates short
+scripts. A daemon started once with ``pyrexact2x2 daemon`` holds worker
+processes with R loaded and listens on a Unix domain socket. The R engine of
+``uncondExact2x2``, ``boschloo`` and the batch functions forwards its calls to
+the daemon when its socket exists, and computes in process otherwise or when
+the daemon stops answering. A process without a daemon looks for the socket
+again every ``RECHECK_INTERVAL`` seconds, so a daemon started later is used.
+
+The socket is ``$XDG_RUNTIME_DIR/pyrexact2x2-<uid>.sock``, and without
+XDG_RUNTIME_DIR ``pyrexact2x2-<uid>/daemon.sock`` in the temporary directory,
+in a directory only the user can access. The environment variable
+PYREXACT2X2_DAEMON names another socket, or disables forwarding when "0".
+Calls are only forwarded to a socket owned by the user and to a daemon of the
+same pyrexact2x2 version and protocol.
+
+Requests and replies are JSON objects, one per line: ``{"call": name,
+"args": [...]}`` is answered by ``{"result": ...}``, by ``{"error": message}``
+when the call raised, or by ``{"failure": message}`` when the daemon could not
+evaluate it, e.g. because R did not start or a worker died. Clients compute
+in process after a failure. The arguments are positional, so the ``PROTOCOL``
+number changes whenever a forwarded signature does.
+"""
+import json
+import multiprocessing
+import os
+import socket
+import socketserver
+import stat
+import tempfile
+import threading
+import time
+from concurrent.futures import BrokenExecutor, ProcessPoolExecutor
+from logging import warning
+from typing import Any, Optional, Tuple
+
+# Seconds between two lookups of the socket by a process without a daemon.
+RECHECK_INTERVAL = 10.0
+
+# Version of the request format and of the argument lists of the calls.
+PROTOCOL = 1
+
+
+def _private_directory() -> str:
+    "Directory of the default socket without XDG_RUNTIME_DIR."
+    return os.path.join(tempfile.gettempdir(), "pyrexact2x2-%d" % os.getuid())
+
+
+def socket_path() -> Optional[str]:
+    "Path of the daemon socket, None if forwarding is disabled."
+    env = os.environ.get("PYREXACT2X2_DAEMON")
+    if env == "0" or not hasattr(socket, "AF_UNIX"):
+        return None
+    if env:
+        return env
+    if os.environ.get("XDG_RUNTIME_DIR"):
+        return os.path.join(os.environ["XDG_RUNTIME_DIR"], "pyrexact2x2-%d.sock" % os.getuid())
+    return os.path.join(_private_directory(), "daemon.sock")
+
+
+def _make_private_directory(directory: str) -> None:
+    "Create ``directory`` accessible only to the user, or check an existing one."
+    try:
+        os.mkdir(directory, 0o700)
+    except FileExistsError:
+        pass
+    st = os.lstat(directory)
+    if not stat.S_ISDIR(st.st_mode) or st.st_uid != os.getuid() or st.st_mode & 0o077:
+        raise PermissionError("%s is not a directory private to this user" % directory)
+
+
+def _check_owner(path: str) -> None:
+    """Raise PermissionError unless ``path`` is a socket owned by the user, so
+    that no other user can receive the tables or answer with forged
+    p-values."""
+    st = os.lstat(path)
+    if not stat.S_ISSOCK(st.st_mode) or st.st_uid != os.getuid():
+        raise PermissionError("%s is not a socket owned by this user" % path)
+
+
+def _version() -> Tuple[int, str]:
+    from . import __version__
+
+    return PROTOCOL, __version__
+
+
+def _default(value):
+    # NumPy scalars and arrays in the arguments.
+    if hasattr(value, "tolist"):
+        return value.tolist()
+    raise TypeError("Cannot send %r to the daemon" % (value,))
+
+
+class Client:
+    """Connection to a daemon, opened on the first call and reopened in a
+    forked child.
+
+    Args:
+        path: Socket of the daemon.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._file = None
+        self._pid = None
+
+    def _connect(self):
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            sock.connect(self.path)
+        except OSError:
+            sock.close()
+            raise
+        self._file = sock.makefile("rwb")
+        self._pid = os.getpid()
+        sock.close()  # the file holds its own reference
+
+    def call(self, call: str, *args) -> Any:
+        """Run ``call`` in the daemon.
+
+        Raises:
+            OSError: The daemon is not reachable or could not evaluate the
+                call.
+            RuntimeError: The call raised in the daemon.
+        """
+        request = {"call": call, "args": args}
+        request = json.dumps(request, default=_default).encode() + b"\n"
+        with self._lock:
+            if self._file is None or self._pid != os.getpid():
+                self._connect()
+            try:
+                self._file.write(request)
+                self._file.flush()
+                line = self._file.readline()
+            except OSError:
+                self.close()
+                raise
+            if not line:
+                self.close()
+                raise ConnectionError("The daemon at %s closed the connection" % self.path)
+        reply = json.loads(line)
+        if "failure" in reply:
+            raise ConnectionError("The daemon at %s failed: %s" % (self.path, reply["failure"]))
+        if "error" in reply:
+            raise RuntimeError(reply["error"])
+        return reply["result"]
+
+    def close(self) -> None:
+        if self._file is not None and self._pid == os.getpid():
+            try:
+                self._file.close()
+            except OSError:
+                pass
+        self._file = None
+
+
+# The client forwarding calls, None without a daemon. Without one the socket
+# is looked up again from time _next_check on, never after disconnect_daemon().
+_client = None
+_next_check = 0.0
+
+
+def _open(path: str) -> Client:
+    """A client of the daemon at ``path`` after checking the owner of the
+    socket and the version of the daemon.
+
+    Raises:
+        OSError: No daemon answers at the path, or the socket belongs to
+            another user.
+        RuntimeError: The daemon runs another version or protocol.
+    """
+    _check_owner(path)
+    new = Client(path)
+    try:
+        info = new.call("ping")
+        expected = _version()
+        found = (info.get("protocol"), info.get("version"))
+        if found != expected:
+            raise RuntimeError(
+                "The daemon at %s runs protocol %s of pyrexact2x2 %s, expected protocol %s of %s"
+                % ((path,) + found + expected)
+            )
+    except BaseException:
+        new.close()
+        raise
+    return new
+
+
+def client() -> Optional[Client]:
+    "The client forwarding calls, None if no usable daemon socket exists."
+    global _client, _next_check
+    if _client is None and time.monotonic() >= _next_check:
+        path = socket_path()
+        if path is not None and os.path.exists(path):
+            try:
+                _client = _open(path)
+            except (OSError, RuntimeError) as e:
+                warning("Not using the pyrexact2x2 daemon at %s: %s", path, e)
+        if _client is None:
+            _next_check = time.monotonic() + RECHECK_INTERVAL
+    return _client
+
+
+def connect_daemon(path: Optional[str] = None) -> Client:
+    """Forward R calls to the daemon at ``path``, by default ``socket_path()``.
+
+    Raises:
+        OSError: No daemon answers at the path, or the socket belongs to
+            another user.
+        RuntimeError: The daemon runs another version of pyrexact2x2 or of
+            its protocol.
+    """
+    global _client
+    path = path or socket_path()
+    if path is None:
+        raise OSError("No daemon socket, forwarding is disabled by PYREXACT2X2_DAEMON")
+    new = _open(path)
+    disconnect_daemon()
+    _client = new
+    return new
+
+
+def _drop(next_check: float) -> None:
+    global _client, _next_check
+    if _client is not None:
+        _client.close()
+    _client = None
+    _next_check = next_check
+
+
+def disconnect_daemon() -> None:
+    "Compute in process from now on."
+    _drop(float("inf"))
+
+
+def forward(call: str, *args) -> Any:
+    """Result of ``call`` from the daemon, None if there is no daemon. A
+    daemon that cannot be reached or fails is dropped with a warning until
+    the next lookup of the socket."""
+    daemon = client()
+    if daemon is None:
+        return None
+    try:
+        return daemon.call(call, *args)
+    except OSError as e:
+        warning("pyrexact2x2 daemon at %s not available, computing in process: %s", daemon.path, e)
+        _drop(time.monotonic() + RECHECK_INTERVAL)
+        return None
+
+
+class _Unavailable(Exception):
+    "R could not be started in a worker."
+
+
+def _init_worker(warmup: bool) -> None:
+    disconnect_daemon()
+    if warmup:
+        from ._session import get_session
+
+        # A failure is reported by the calls; raising here would break the
+        # executor.
+        try:
+            get_session().init()
+        except Exception:
+            pass
+
+
+def _dispatch(call: str, args) -> Any:
+    import numpy as np
+
+    from . import _batch, _boschloo, _uncondExact2x2
+    from ._session import get_session
+
+    if call not in ("uncondExact2x2", "boschloo", "batch"):
+        raise ValueError("Unknown call %r" % (call,))
+    try:
+        get_session().init()
+    except Exception as e:
+        raise _Unavailable("R could not be started: %s: %s" % (type(e).__name__, e))
+    if call == "uncondExact2x2":
+        return _uncondExact2x2(*args).astuple()
+    if call == "boschloo":
+        return _boschloo(*args).astuple()
+    test, cols, options = args
+    cols = {k: np.asarray(v) for k, v in cols.items()}
+    options = {k: np.asarray(v) for k, v in options.items()}
+    return _batch._run_batch(test, cols, options).data.tolist()
+
+
+class _Handler(socketserver.StreamRequestHandler):
+    def handle(self):
+        for line in self.rfile:
+            try:
+                request = json.loads(line)
+                if request["call"] == "ping":
+                    protocol, version = self.server.version
+                    result = {
+                        "pid": os.getpid(),
+                        "workers": self.server.workers,
+                        "protocol": protocol,
+                        "version": version,
+                    }
+                else:
+                    result = self.server.evaluate(request["call"], request["args"])
+                reply = {"result": result}
+            except _Unavailable as e:
+                reply = {"failure": str(e)}
+            except Exception as e:
+                reply = {"error": "%s: %s" % (type(e).__name__, e)}
+            self.wfile.write(json.dumps(reply, default=_default).encode() + b"\n")
+            self.wfile.flush()
+
+
+class Daemon(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    """Server evaluating forwarded calls on worker processes with R loaded.
+
+    Args:
+        path: Socket to listen on, by default ``socket_path()``. A stale
+            socket of the user left by a daemon that died is replaced.
+        workers: Number of worker processes, each with its own R.
+        warmup: Start R in each worker when it starts.
+
+    ``serve_forever()`` handles requests until ``shutdown()`` is called from
+    another thread; ``close()`` then stops the workers and removes the socket.
+    """
+
+    daemon_threads = True
+
+    def __init__(self, path: Optional[str] = None, workers: int = 1, warmup: bool = True):
+        path = path or socket_path()
+        if path is None:
+            raise ValueError("No socket path, PYREXACT2X2_DAEMON is 0")
+        if os.path.dirname(path) == _private_directory():
+            _make_private_directory(_private_directory())
+        if os.path.lexists(path):
+            _check_owner(path)
+            try:
+                Client(path).call("ping")
+            except OSError:
+                os.unlink(path)
+            else:
+                raise OSError("A daemon is already listening on %s" % path)
+        self.path = path
+        self.version = _version()
+        self.workers = workers
+        self.warmup = warmup
+        self._executor_lock = threading.Lock()
+        self.executor = self._start_executor()
+        super().__init__(path, _Handler)
+        os.chmod(path, 0o600)
+
+    def _start_executor(self) -> ProcessPoolExecutor:
+        return ProcessPoolExecutor(
+            self.workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker,
+            initargs=(self.warmup,),
+        )
+
+    def evaluate(self, call: str, args) -> Any:
+        """Result of ``call`` from a worker.
+
+        Raises:
+            _Unavailable: The workers cannot evaluate calls. A broken
+                executor, e.g. after a worker died, is replaced for the
+                next call.
+        """
+        executor = self.executor
+        try:
+            return executor.submit(_dispatch, call, args).result()
+        except BrokenExecutor as e:
+            with self._executor_lock:
+                if self.executor is executor:
+                    executor.shutdown(wait=False)
+                    self.executor = self._start_executor()
+            raise _Unavailable("Worker processes failed: %s" % (e,))
+
+    def close(self) -> None:
+        self.server_close()
+        self.executor.shutdown()
+        if os.path.exists(self.path):
+            os.unlink(self.path)
+
+    def __enter__(self) -> "Daemon":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
@@ -0,0 +1,143 @@
+"""Significance decisions computing p-values only as far as needed.
+
+Screening often needs only whether p < alpha. Boschloo's p-value never
+exceeds Fisher's exact p-value, so tables significant by Fisher's test are
+decided without the unconditional search. With the numpy engine the search
+over the nuisance parameter then evaluates a coarse subgrid and the full grid
+first, and stops as soon as the probability reaches alpha, since every
+evaluated point bounds the supremum from below. Only borderline tables get
+the full search.
+"""
+from typing import Optional, Tuple
+
+import numpy as np
+
+from ._batch import _broadcast
+
+_TESTS = ("uncondExact2x2", "boschloo")
+
+
+def _check_test(test: str) -> None:
+    if test not in _TESTS:
+        raise ValueError("Unknown test %r, expected one of %s" % (test, list(_TESTS)))
+
+
+def _fisher_bound(
+    x1: int,
+    n1: int,
+    x2: int,
+    n2: int,
+    alternative: str = "two.sided",
+    OR: float = 1.0,
+    midp: bool = False,
+    tsmethod: str = "central",
+    **ignored
+) -> float:
+    """Fisher's exact p-value, an upper bound of Boschloo's p-value. The mid
+    p-value has no such bound, which gives 1."""
+    from ._numpy_engine import _fisher_pvalues
+
+    if midp:
+        return 1.0
+    less, greater, minlike = _fisher_pvalues(n1, n2, float(1.0 if OR is None else OR))
+    if alternative == "less":
+        return float(less[x1, x2])
+    if alternative == "greater":
+        return float(greater[x1, x2])
+    if tsmethod == "minlike":
+        return float(minlike[x1, x2])
+    return float(min(1.0, 2 * min(less[x1, x2], greater[x1, x2])))
+
+
+def pvalue_bounds(
+    x1: int, n1: int, x2: int, n2: int, test: str = "boschloo", control=None, **options
+) -> Tuple[float, float]:
+    """Cheap lower and upper bounds of the p-value of a test.
+
+    The lower bound is the largest region probability on a coarse subgrid of
+    the nuisance parameter, computed by the numpy engine; it is 0 for options
+    that engine does not support. The upper bound is Fisher's exact p-value
+    for Boschloo's test and 1 otherwise.
+
+    Returns:
+        tuple: (lower, upper)
+    """
+    from . import _numpy_engine
+
+    _check_test(test)
+    options["conf_int"] = False
+    upper = _fisher_bound(x1, n1, x2, n2, **options) if test == "boschloo" else 1.0
+    try:
+        res = getattr(_numpy_engine, test)(x1, n1, x2, n2, control=control, level=0.0, **options)
+    except ValueError:
+        return 0.0, upper
+    return min(res.p_value, upper), upper
+
+
+def decide(
+    x1: int,
+    n1: int,
+    x2: int,
+    n2: int,
+    alpha: float = 0.05,
+    test: str = "boschloo",
+    engine: str = "numpy",
+    control: Optional[dict] = None,
+    **options
+) -> bool:
+    """Whether the p-value of a test is below ``alpha``.
+
+    The answer is the same as comparing the p-value of the test with alpha,
+    but the p-value is computed only until the comparison is certain.
+
+    Args:
+        x1, n1, x2, n2: The table.
+        alpha: Significance level.
+        test: "boschloo" or "uncondExact2x2".
+        engine: "numpy" for the early terminating search. With "R" only the
+            Fisher bound is tried before the full computation.
+        control: As in ``uncondExact2x2``.
+        **options: Options of the test.
+
+    Returns:
+        bool: True if the p-value is below alpha.
+    """
+    _check_test(test)
+    options["conf_int"] = False
+    if test == "boschloo" and _fisher_bound(x1, n1, x2, n2, **options) < alpha:
+        return True
+    if engine == "numpy":
+        from . import _numpy_engine
+
+        func = getattr(_numpy_engine, test)
+        return func(x1, n1, x2, n2, control=control, level=alpha, **options).p_value < alpha
+    from . import boschloo, uncondExact2x2
+
+    func = boschloo if test == "boschloo" else uncondExact2x2
+    return func(x1, n1, x2, n2, engine=engine, control=control, **options).p_value < alpha
+
+
+def decide_many(
+    x1,
+    n1,
+    x2,
+    n2,
+    alpha=0.05,
+    test: str = "boschloo",
+    engine: str = "numpy",
+    control: Optional[dict] = None,
+    **options
+) -> np.ndarray:
+    """``decide`` for arrays of tables. Counts, alpha and options may be
+    scalars or one value per table.
+
+    Returns:
+        np.ndarray: Boolean array, True where the p-value is below alpha.
+    """
+    cols = _broadcast(x1=x1, n1=n1, x2=x2, n2=n2, alpha=alpha, **options)
+    names = list(cols)
+    out = np.empty(len(cols["x1"]), dtype=bool)
+    for i, row in enumerate(zip(*[cols[k].tolist() for k in names])):
+        kwargs = dict(zip(names, row))
+        out[i] = decide(test=test, engine=engine, control=control, **kwargs)
+    return out
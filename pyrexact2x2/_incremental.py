@@ -0,0 +1,216 @@
+"""Incremental re-testing of counts that grow over time.
+
+A live experiment tests its counters every few seconds, and between two
+evaluations n1 and n2 grow by a handful. ``IncrementalTester`` keeps the state
+of the last evaluation and updates it instead of starting over:
+
+- The binomial probabilities of each group on the nuisance grid are extended
+  from n to n + d trials by the recurrence P(n+1, k) = (1 - t) P(n, k) +
+  t P(n, k-1), which needs no logarithms or exponentials. A group whose n did
+  not change keeps its probabilities as they are.
+- The ordering statistic or Fisher p-values of the design are reused while
+  n1 and n2 stay the same.
+- The confidence limits are searched from small brackets around the previous
+  limits instead of the whole range of the odds ratio.
+- Unchanged counts return the previous result.
+
+Memory is bounded: only the state of the current design is kept, and it
+bypasses the module level caches of the numpy engine, which would otherwise
+collect the tables of every design the counters pass through.
+"""
+import inspect
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+
+from . import _control
+from . import _numpy_engine as engine
+from ._decide import _check_test
+from ._result import Result
+
+# Growth in trials up to which the binomial probabilities are extended by the
+# recurrence; larger jumps recompute them.
+_MAX_STEP = 16
+
+
+def _grow_pmf(B: np.ndarray, theta: np.ndarray, steps: int) -> np.ndarray:
+    "Binomial probabilities for ``steps`` more trials at the same thetas."
+    t = theta[:, None]
+    for _ in range(steps):
+        grown = np.zeros((B.shape[0], B.shape[1] + 1))
+        grown[:, :-1] = B * (1 - t)
+        grown[:, 1:] += B * t
+        B = grown
+    return B
+
+
+class IncrementalTester:
+    """Numpy engine test of one experiment whose counts change between calls.
+
+    Args:
+        test: "boschloo" or "uncondExact2x2".
+        control: As in ``uncondExact2x2``.
+        max_bytes: Largest size of the design tables, the ordering statistic
+            or Fisher p-values and the hypergeometric weights, kept between
+            calls. Larger designs recompute them on every call. The other
+            state grows only linearly in n1 and n2.
+        **options: Fixed options of the test, e.g. ``alternative``,
+            ``method`` or, for Boschloo's test, ``conf_int``.
+
+    Example::
+
+        tester = pyrexact2x2.IncrementalTester("boschloo", conf_int=True)
+        while running:
+            res = tester.update(x1, n1, x2, n2)
+
+    The results agree with those of the numpy engine of ``boschloo`` and
+    ``uncondExact2x2`` up to rounding and, for the confidence limits, the
+    error bound of their search.
+    """
+
+    def __init__(
+        self,
+        test: str = "boschloo",
+        control: Optional[Dict] = None,
+        max_bytes: int = 256 * 2 ** 20,
+        **options
+    ):
+        _check_test(test)
+        bound = inspect.signature(getattr(engine, test)).bind(0, 1, 0, 1, **options)
+        bound.apply_defaults()
+        opts = {k: v for k, v in bound.arguments.items() if k not in ("x1", "n1", "x2", "n2")}
+        if test == "boschloo":
+            opts["OR"] = 1.0 if opts["OR"] is None else float(opts["OR"])
+            theta2 = engine._or_null(opts["OR"])
+            lo, hi = 0.0, 1.0
+        else:
+            if opts["gamma"] > 0 or opts["EplusM"] or opts["tiebreak"]:
+                raise ValueError("gamma, EplusM and tiebreak are not supported by the numpy engine")
+            if opts["conf_int"]:
+                raise ValueError(
+                    "conf_int is not supported by the numpy engine of uncondExact2x2"
+                )
+            if opts["nullparm"] is None:
+                opts["nullparm"] = 0.0 if opts["parmtype"] == "difference" else 1.0
+            opts["nullparm"] = float(opts["nullparm"])
+            theta2, lo, hi = engine._nuisance(opts["parmtype"], opts["nullparm"])
+        self.test = test
+        self.control = _control.resolve(control)
+        self.max_bytes = max_bytes
+        self.options = opts
+        self._grid = np.linspace(lo, hi, self.control["nPgrid"])
+        self._theta2 = theta2(self._grid)
+        self.reset()
+
+    def reset(self) -> None:
+        "Drop all state."
+        self._pmf_n = (None, None)
+        self._B1 = self._B2 = None
+        self._design_n = None
+        self._base = self._design = None
+        self._last = None
+        self._ci = None
+
+    @property
+    def nbytes(self) -> int:
+        "Size of the arrays kept between calls."
+        arrays = [self._B1, self._B2]
+        if self._design is not None:
+            arrays += [self._base[0], *self._tables(self._design)]
+        return sum(a.nbytes for a in arrays if a is not None)
+
+    @staticmethod
+    def _tables(design) -> Tuple:
+        return design if isinstance(design, tuple) else (design,)
+
+    def _pmf(self, B: Optional[np.ndarray], n_old: Optional[int], n: int, theta: np.ndarray):
+        if B is not None and 0 <= n - n_old <= _MAX_STEP:
+            return _grow_pmf(B, theta, n - n_old)
+        return engine._binom_pmf(n, theta)
+
+    def _design_tables(self, n1: int, n2: int):
+        "Hypergeometric base and ordering tables of a design, bypassing the caches."
+        if self._design is not None and self._design_n == (n1, n2):
+            return self._base, self._design
+        o = self.options
+        base = engine._hypergeometric_base.__wrapped__(n1, n2)
+        if self.test == "boschloo":
+            minlike = o["tsmethod"] == "minlike"
+            return base, engine._fisher_tables(n1, n2, o["OR"], minlike, base)
+        T = engine._tstat_table(n1, n2, o["method"], o["parmtype"], o["nullparm"], base)
+        return base, T
+
+    def update(self, x1: int, n1: int, x2: int, n2: int) -> Result:
+        "The test result for the current counts."
+        counts = (x1, n1, x2, n2)
+        if self._last is not None and self._last[0] == counts:
+            return self._last[1].copy()
+        assert 0 <= x1 <= n1
+        assert 0 <= x2 <= n2
+        B1 = self._pmf(self._B1, self._pmf_n[0], n1, self._grid)
+        B2 = self._pmf(self._B2, self._pmf_n[1], n2, self._theta2)
+        base, design = self._design_tables(n1, n2)
+
+        o, control = self.options, self.control
+        if self.test == "boschloo":
+            p_value = engine._boschloo_pvalue(
+                x1,
+                n1,
+                x2,
+                n2,
+                o["alternative"],
+                o["OR"],
+                o["midp"],
+                o["tsmethod"],
+                control,
+                design=(design, self._grid, B1, B2),
+            )
+            ci = (np.nan, np.nan)
+            if o["conf_int"]:
+                ci = engine._boschloo_ci(
+                    x1,
+                    n1,
+                    x2,
+                    n2,
+                    o["alternative"],
+                    o["conf_level"],
+                    o["midp"],
+                    o["tsmethod"],
+                    control,
+                    B1=B1,
+                    base=base,
+                    start=self._ci,
+                )
+                self._ci = ci
+            res = engine._boschloo_result(
+                x1, n1, x2, n2, o["alternative"], o["OR"], o["midp"], p_value, ci
+            )
+        else:
+            p_value = engine._uncond_pvalue(
+                x1,
+                n1,
+                x2,
+                n2,
+                o["parmtype"],
+                o["nullparm"],
+                o["alternative"],
+                o["method"],
+                o["tsmethod"],
+                o["midp"],
+                control,
+                design=(design, self._grid, B1, B2),
+            )
+            res = engine._uncond_result(
+                x1, n1, x2, n2, o["parmtype"], o["nullparm"], o["alternative"], o["method"], p_value
+            )
+
+        # The grid probabilities grow linearly in n and are always kept, the
+        # design tables only while they fit into max_bytes.
+        self._pmf_n, self._B1, self._B2 = (n1, n2), B1, B2
+        size = base[0].nbytes + sum(a.nbytes for a in self._tables(design) if a is not None)
+        if size <= self.max_bytes:
+            self._design_n, self._base, self._design = (n1, n2), base, design
+        else:
+            self._design_n, self._base, self._design = None, None, None
+        self._last = (counts, res.copy())
+        return res
@@ -0,0 +1,155 @@
+"""Opt-in timing of the phases of each test call.
+
+The phases are
+
+    cache_lookup: looking the result up in the result cache
+          import: starting R and resolving the exact2x2 handles
+      convert_in: converting the arguments from Python to R
+         compute: the computation itself, in R or in the numpy engine
+     convert_out: converting the R result back to Python
+
+Timings are recorded per (function, method, engine) only while an
+``Instrumentation`` is active, so the hooks cost next to nothing otherwise::
+
+    with pyrexact2x2.instrument() as timings:
+        pyrexact2x2.uncondExact2x2(1, 5, 0, 6)
+    print(timings.summary())
+"""
+import json
+import threading
+from collections import defaultdict
+from contextlib import contextmanager
+from time import perf_counter
+from typing import Dict, List, Optional, Tuple
+
+
+class Instrumentation:
+    "Collector of phase timings in seconds."
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._timings = defaultdict(list)
+
+    def record(self, function: str, method: str, engine: str, phase: str, seconds: float) -> None:
+        with self._lock:
+            self._timings[(function, method, engine, phase)].append(seconds)
+
+    def reset(self) -> None:
+        with self._lock:
+            self._timings.clear()
+
+    def timings(
+        self,
+        function: str,
+        phase: str,
+        method: Optional[str] = None,
+        engine: Optional[str] = None,
+    ) -> List[float]:
+        "All recorded durations of a phase, optionally only for one method or engine."
+        with self._lock:
+            return [
+                t
+                for (f, m, e, p), values in self._timings.items()
+                if f == function and p == phase and method in (None, m) and engine in (None, e)
+                for t in values
+            ]
+
+    def summary(self) -> Dict[str, Dict]:
+        """Call counts and per phase statistics.
+
+        Returns:
+            dict: keyed by "function/method/engine", each with the number of
+            ``calls`` and for every phase its count, total, mean, min and max
+            in seconds.
+        """
+        out = {}
+        with self._lock:
+            items = sorted(self._timings.items())
+        for (function, method, engine, phase), values in items:
+            entry = out.setdefault("%s/%s/%s" % (function, method, engine), {"calls": 0})
+            entry[phase] = {
+                "count": len(values),
+                "total": sum(values),
+                "mean": sum(values) / len(values),
+                "min": min(values),
+                "max": max(values),
+            }
+            entry["calls"] = max(entry["calls"], len(values))
+        return out
+
+    def histogram(
+        self,
+        function: str,
+        phase: str,
+        method: Optional[str] = None,
+        engine: Optional[str] = None,
+        bins=10,
+    ) -> Tuple:
+        "Histogram of the durations of a phase as ``numpy.histogram`` returns it."
+        import numpy as np
+
+        return np.histogram(self.timings(function, phase, method, engine), bins=bins)
+
+    def to_json(self, raw: bool = False) -> str:
+        """The summary as JSON. With ``raw`` the individual durations are
+        included under "timings"."""
+        data = {"summary": self.summary()}
+        if raw:
+            with self._lock:
+                data["timings"] = [
+                    {"function": f, "method": m, "engine": e, "phase": p, "seconds": list(v)}
+                    for (f, m, e, p), v in sorted(self._timings.items())
+                ]
+        return json.dumps(data, indent=1)
+
+    def dump(self, path: str, raw: bool = False) -> None:
+        with open(path, "w") as f:
+            f.write(self.to_json(raw))
+
+
+_active: Optional[Instrumentation] = None
+
+
+def enable_instrumentation() -> Instrumentation:
+    "Start recording timings globally into a new collector and return it."
+    global _active
+    _active = Instrumentation()
+    return _active
+
+
+def disable_instrumentation() -> None:
+    global _active
+    _active = None
+
+
+@contextmanager
+def instrument():
+    "Record timings into a new collector for the duration of the block."
+    global _active
+    previous, _active = _active, Instrumentation()
+    try:
+        yield _active
+    finally:
+        _active = previous
+
+
+class phase:
+    """Context manager timing one phase of a call into the active collector."""
+
+    __slots__ = ("function", "method", "engine", "name", "start")
+
+    def __init__(self, function: str, method: str, engine: str, name: str):
+        self.function = function
+        self.method = method
+        self.engine = engine
+        self.name = name
+
+    def __enter__(self):
+        self.start = None if _active is None else perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        if _active is not None and self.start is not None:
+            _active.record(
+                self.function, self.method, self.engine, self.name, perf_counter() - self.start
+            )
@@ -0,0 +1,170 @@
+"""Multiple testing over batches of tables with lazy exact evaluation.
+
+The procedures of Bonferroni, Holm, Benjamini-Hochberg and Benjamini-Yekutieli
+reject fewer hypotheses when any p-value grows. So if every p-value is only
+known to lie in an interval, the tables rejected with all p-values at their
+upper bounds are surely rejected and those not rejected with all p-values at
+their lower bounds are surely not. Only the tables in between can change the
+decisions, and only their exact p-values are computed, repeating until no
+table is left in between. The bounds are those of ``pvalue_bounds``: Fisher's
+exact p-value from above for Boschloo's test, and a coarse search over the
+nuisance parameter from below. That search orders the tables and places its
+grid like the numpy engine, not like R, so with the R engine the lower bound
+is 0.
+"""
+from collections import namedtuple
+from functools import partial
+from typing import Dict, Optional
+
+import numpy as np
+
+from . import _control
+from ._batch import _broadcast
+from ._decide import _check_test, _fisher_bound, pvalue_bounds
+
+MultipleTests = namedtuple(
+    "MultipleTests", ["reject", "p_value", "lower", "upper", "evaluated", "rounds"]
+)
+MultipleTests.__doc__ = """Result of ``multiple_tests``.
+
+reject: Boolean array, True for the rejected hypotheses.
+p_value: Exact p-values of the evaluated tables, NaN for the others.
+lower, upper: Bounds of the p-values, equal for the evaluated tables.
+evaluated: Number of tables whose exact p-value was computed.
+rounds: Number of rounds of exact evaluation.
+"""
+
+_METHODS = ("bonferroni", "holm", "BH", "BY")
+
+
+def reject(p: np.ndarray, alpha: float = 0.05, method: str = "BH") -> np.ndarray:
+    """Hypotheses rejected by a multiple testing procedure.
+
+    Args:
+        p: p-values; NaN counts as 1.
+        alpha: Family-wise error rate (bonferroni, holm) or false discovery
+            rate (BH, BY) to control.
+        method: "bonferroni", "holm", "BH" or "BY".
+
+    Returns:
+        np.ndarray: Boolean array, True for the rejected hypotheses.
+    """
+    if method not in _METHODS:
+        raise ValueError("Unknown method %r, expected one of %s" % (method, list(_METHODS)))
+    p = np.where(np.isnan(p), 1.0, np.asarray(p, dtype=float))
+    m = len(p)
+    out = np.zeros(m, dtype=bool)
+    if m == 0:
+        return out
+    if method == "bonferroni":
+        return p <= alpha / m
+    order = np.argsort(p, kind="stable")
+    ranks = np.arange(1, m + 1)
+    if method == "holm":
+        fails = p[order] > alpha / (m - ranks + 1)
+        k = np.argmax(fails) if fails.any() else m
+        out[order[:k]] = True
+        return out
+    if method == "BY":
+        alpha = alpha / np.sum(1.0 / ranks)
+    passes = np.nonzero(p[order] <= ranks * alpha / m)[0]
+    if len(passes):
+        out[order[: passes[-1] + 1]] = True
+    return out
+
+
+def _exact(
+    test: str, engine: str, control: Optional[Dict], cols: Dict[str, np.ndarray], idx: np.ndarray
+) -> np.ndarray:
+    "Exact p-values of the tables ``idx``."
+    sub = {k: v[idx] for k, v in cols.items()}
+    if engine == "R":
+        from . import _batch, boschloo, uncondExact2x2
+
+        # The batch functions use the default control settings.
+        if _control.key(control) is None:
+            return getattr(_batch, test + "_many")(**sub).p_value
+        func = partial(boschloo if test == "boschloo" else uncondExact2x2, engine="R")
+    else:
+        from . import _numpy_engine
+
+        func = getattr(_numpy_engine, test)
+    names = list(sub)
+    return np.array(
+        [
+            func(control=control, **dict(zip(names, row))).p_value
+            for row in zip(*[sub[k].tolist() for k in names])
+        ],
+        dtype=float,
+    )
+
+
+def multiple_tests(
+    x1,
+    n1,
+    x2,
+    n2,
+    alpha: float = 0.05,
+    method: str = "BH",
+    test: str = "boschloo",
+    engine: str = "numpy",
+    control: Optional[Dict] = None,
+    **options
+) -> MultipleTests:
+    """Test a batch of tables with a multiple testing procedure, computing
+    exact p-values only where they can change a decision.
+
+    The decisions are those of ``reject`` applied to the exact p-values of
+    all tables, up to the accuracy of the grid search over the nuisance
+    parameter.
+
+    Args:
+        x1, n1, x2, n2: Counts, scalars or one value per table.
+        alpha: Error rate to control, see ``reject``.
+        method: "bonferroni", "holm", "BH" or "BY".
+        test: "boschloo" or "uncondExact2x2".
+        engine: "numpy" or "R" for the exact p-values. With "R" the tables
+            of each round are evaluated in one ``_many`` call, or one by one
+            with a ``control`` other than the defaults, and the lower bounds
+            are 0.
+        control: As in ``uncondExact2x2``.
+        **options: Options of the test, scalars or one value per table.
+
+    Returns:
+        MultipleTests
+    """
+    _check_test(test)
+    if method not in _METHODS:
+        raise ValueError("Unknown method %r, expected one of %s" % (method, list(_METHODS)))
+    cols = _broadcast(x1=x1, n1=n1, x2=x2, n2=n2, **options)
+    names = list(cols)
+    m = len(cols["x1"])
+    lower, upper = np.empty(m), np.empty(m)
+    for i, row in enumerate(zip(*[cols[k].tolist() for k in names])):
+        kwargs = dict(zip(names, row))
+        if engine == "R":
+            lower[i] = 0.0
+            upper[i] = _fisher_bound(**kwargs) if test == "boschloo" else 1.0
+        else:
+            lower[i], upper[i] = pvalue_bounds(test=test, control=control, **kwargs)
+    lower[np.isnan(lower)] = 0.0
+
+    p_value = np.full(m, np.nan)
+    exact = np.zeros(m, dtype=bool)
+    rounds = 0
+    while True:
+        surely = reject(upper, alpha, method)
+        maybe = reject(lower, alpha, method)
+        if np.array_equal(surely, maybe):
+            break
+        pending = maybe & ~surely & ~exact
+        if not pending.any():
+            pending = maybe & ~exact
+        if not pending.any():
+            pending = ~exact
+        idx = np.nonzero(pending)[0]
+        p_value[idx] = _exact(test, engine, control, cols, idx)
+        lower[idx] = upper[idx] = p_value[idx]
+        exact[idx] = True
+        rounds += 1
+    return MultipleTests(surely, p_value, lower, upper, int(exact.sum()), rounds)
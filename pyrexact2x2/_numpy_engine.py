@@ -0,0 +1,849 @@
+"""Native NumPy implementation of the unconditional exact tests.
+
+The sample space of a design (n1, n2) is handled as a (n1+1) x (n2+1) array.
+A test orders the sample space by a statistic, marks the tables at least as
+extreme as the observed one and computes the probability of that region as
+``sum(B1 @ W * B2, axis=1)``, where the rows of B1 and B2 are the binomial
+probabilities of the two groups at each point of a grid over the nuisance
+parameter. The p-value is the supremum of that probability over the grid,
+refined locally around the largest maxima.
+"""
+import threading
+from collections import OrderedDict
+from functools import wraps
+from typing import Callable, Dict, Optional, Tuple
+
+import numpy as np
+
+from . import _control
+from ._result import Result
+
+# Relative tolerance for ties of the ordering statistic, as in R's fisher.test.
+_REL_ERR = 1 + 1e-7
+
+_lfact = np.zeros(1)
+
+
+class _ArrayCache:
+    """Least recently used cache of the per design arrays, bounded by their
+    total size in bytes rather than by the number of designs, since the
+    arrays of one design grow as n1 * n2."""
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self.nbytes = 0
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _size(value) -> int:
+        if isinstance(value, np.ndarray):
+            return value.nbytes
+        if isinstance(value, tuple):
+            return sum(_ArrayCache._size(v) for v in value)
+        return 0
+
+    def _evict(self) -> None:
+        while self.nbytes > self.max_bytes:
+            _, (_, size) = self._data.popitem(last=False)
+            self.nbytes -= size
+
+    def __call__(self, func: Callable) -> Callable:
+        "Decorator memoising ``func`` in the cache."
+
+        @wraps(func)
+        def cached(*args):
+            key = (func.__name__,) + args
+            with self._lock:
+                if key in self._data:
+                    self._data.move_to_end(key)
+                    return self._data[key][0]
+            value = func(*args)
+            size = self._size(value)
+            with self._lock:
+                if size <= self.max_bytes and key not in self._data:
+                    self._data[key] = (value, size)
+                    self.nbytes += size
+                    self._evict()
+            return value
+
+        return cached
+
+    def resize(self, max_bytes: int) -> None:
+        with self._lock:
+            self.max_bytes = max_bytes
+            self._evict()
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+            self.nbytes = 0
+
+
+_array_cache = _ArrayCache(128 * 2 ** 20)
+
+
+def set_numpy_cache_size(max_bytes: int) -> None:
+    """Bound the memory held by the numpy engine for the designs it has seen
+    (hypergeometric weights, Fisher p-values, ordering statistics and
+    nuisance grids), by default 128 MiB. Least recently used designs are
+    dropped first; 0 disables the cache."""
+    _array_cache.resize(max_bytes)
+
+
+def _log_factorial(n: int) -> np.ndarray:
+    "log(k!) for k = 0..n, grown on demand and shared by all designs."
+    global _lfact
+    if len(_lfact) <= n:
+        k = np.arange(len(_lfact), 2 * n + 2)
+        _lfact = np.concatenate([_lfact, _lfact[-1] + np.cumsum(np.log(k))])
+    return _lfact[: n + 1]
+
+
+def _log_choose(n: int) -> np.ndarray:
+    lf = _log_factorial(n)
+    return lf[n] - lf - lf[::-1]
+
+
+def _binom_pmf(n: int, theta: np.ndarray) -> np.ndarray:
+    "Binomial(n, theta) probabilities, shape (len(theta), n+1)."
+    theta = np.asarray(theta, dtype=float)[:, None]
+    k = np.arange(n + 1)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        successes = np.where(k == 0, 0.0, k * np.log(theta))
+        failures = np.where(k == n, 0.0, (n - k) * np.log1p(-theta))
+    return np.exp(_log_choose(n) + successes + failures)
+
+
+@_array_cache
+def _hypergeometric_base(n1: int, n2: int):
+    """Log weights of X2 = y given x1 + x2 = s at odds ratio one, shape
+    (n1+n2+1, n2+1), and the (s, y) index of every table of the design."""
+    s = np.arange(n1 + n2 + 1)[:, None]
+    y = np.arange(n2 + 1)[None, :]
+    valid = (s - y >= 0) & (s - y <= n1)
+    logw = np.where(valid, _log_choose(n1)[np.clip(s - y, 0, n1)] + _log_choose(n2), -np.inf)
+    a = np.arange(n1 + 1)[:, None]
+    b = np.arange(n2 + 1)[None, :]
+    return logw, y, (a + b, np.broadcast_to(b, (n1 + 1, n2 + 1)))
+
+
+def _fisher_tables(
+    n1: int, n2: int, OR: float, minlike: bool = True, base=None
+) -> Tuple[np.ndarray, np.ndarray, Optional[np.ndarray]]:
+    """Uncached ``_fisher_pvalues``; minlike is None unless requested. ``base``
+    is the ``_hypergeometric_base`` of the design, looked up if not given."""
+    logw0, y, (rows, cols) = base if base is not None else _hypergeometric_base(n1, n2)
+    logw = logw0 + y * np.log(OR)
+    logw -= logw.max(axis=1, keepdims=True)
+    dens = np.exp(logw)
+    dens /= dens.sum(axis=1, keepdims=True)
+
+    less = np.cumsum(dens, axis=1)
+    greater = np.cumsum(dens[:, ::-1], axis=1)[:, ::-1]
+    two_sided = None
+    if minlike:
+        two_sided = np.empty_like(dens)
+        for i, row in enumerate(dens):
+            order = np.sort(row)
+            csum = np.cumsum(order)
+            two_sided[i] = csum[np.searchsorted(order, row * _REL_ERR, side="right") - 1]
+        two_sided = np.minimum(two_sided[rows, cols], 1.0)
+    return np.minimum(less[rows, cols], 1.0), np.minimum(greater[rows, cols], 1.0), two_sided
+
+
+@_array_cache
+def _fisher_pvalues(
+    n1: int, n2: int, OR: float = 1.0
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Fisher's exact p-values of every table of the design.
+
+    Conditional on x1 + x2, X2 follows the (noncentral) hypergeometric
+    distribution with odds ratio ``OR``.
+
+    Returns:
+        tuple: (less, greater, minlike) arrays of shape (n1+1, n2+1) with the
+        one-sided p-values P(X2 <= x2), P(X2 >= x2) and the two-sided p-value
+        summing the probabilities not above that of the observed table.
+    """
+    return _fisher_tables(n1, n2, OR)
+
+
+def _region(T: np.ndarray, t0: float, midp: bool) -> np.ndarray:
+    """Weights of the tables at least as extreme as t0 when smaller values of
+    the statistic T are more extreme. Ties count half when ``midp``."""
+    W = (T <= t0 * _REL_ERR).astype(float)
+    if midp:
+        W -= 0.5 * ((T <= t0 * _REL_ERR) & (T >= t0 / _REL_ERR))
+    return W
+
+
+def _region_prob(W: np.ndarray, B1: np.ndarray, B2: np.ndarray) -> np.ndarray:
+    "Probability of the region W at each grid point."
+    return np.einsum("gi,ij,gj->g", B1, W, B2)
+
+
+def _supremum(
+    f: Callable[[np.ndarray], np.ndarray],
+    grid: np.ndarray,
+    values=None,
+    adaptive: bool = False,
+    ptol: float = 1e-6,
+):
+    """Maximise f over the interval spanned by ``grid``.
+
+    f is evaluated on the grid (unless its ``values`` there are given) and
+    then on successively finer grids around the three largest local maxima:
+    eight zoom steps by default, or until the maximum changes by less than
+    ``ptol`` when ``adaptive``.
+
+    Returns:
+        tuple: (maximum, argmax)
+    """
+    lo, hi = grid[0], grid[-1]
+    if values is None:
+        values = f(grid)
+    inner = np.concatenate([[True], values[1:] >= values[:-1]]) & np.concatenate(
+        [values[:-1] >= values[1:], [True]]
+    )
+    peaks = np.flatnonzero(inner)
+    peaks = peaks[np.argsort(values[peaks])[::-1][:3]]
+    best, arg = values.max(), grid[values.argmax()]
+    step = (hi - lo) / max(len(grid) - 1, 1)
+    for i in peaks:
+        center, width, peak = grid[i], step, values[i]
+        for _ in range(40 if adaptive else 8):
+            local = np.clip(np.linspace(center - width, center + width, 11), lo, hi)
+            local_values = f(local)
+            j = local_values.argmax()
+            center, width = local[j], width / 5
+            if local_values[j] > best:
+                best, arg = local_values[j], local[j]
+            if adaptive and local_values[j] - peak < ptol and width < step / 25:
+                break
+            peak = max(peak, local_values[j])
+    return min(best, 1.0), arg
+
+
+# Points of the coarse subgrid tried first when only a decision is needed.
+_COARSE_POINTS = 10
+
+
+def _bounded_supremum(
+    W: np.ndarray,
+    f: Callable[[np.ndarray], np.ndarray],
+    grid: np.ndarray,
+    B1: np.ndarray,
+    B2: np.ndarray,
+    control: Dict,
+    level: Optional[float] = None,
+) -> float:
+    """Supremum of the probability of the region W over the nuisance grid.
+
+    With a ``level`` the search stops as soon as a subset of the points it
+    would evaluate, first a coarse subgrid and then the whole grid, reaches
+    the level. The result is then a lower bound of at least ``level`` rather
+    than the supremum; below the level it is the supremum.
+    """
+    if level is not None:
+        step = max(1, len(grid) // _COARSE_POINTS)
+        coarse = _region_prob(W, B1[::step], B2[::step]).max()
+        if coarse >= level:
+            return min(coarse, 1.0)
+    values = _region_prob(W, B1, B2)
+    if level is not None and values.max() >= level:
+        return min(values.max(), 1.0)
+    return _supremum(f, grid, values, control["adaptive"], control["ptol"])[0]
+
+
+def _or_null(OR: float) -> Callable[[np.ndarray], np.ndarray]:
+    "theta2 as a function of theta1 on the null odds ratio OR."
+    return lambda theta1: OR * theta1 / (1 - theta1 + OR * theta1)
+
+
+def _odds_ratio(x1: int, n1: int, x2: int, n2: int) -> float:
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return float(np.float64(x2 * (n1 - x1)) / np.float64(x1 * (n2 - x2)))
+
+
+def _estimate(x1: int, n1: int, x2: int, n2: int, parmtype: str) -> float:
+    with np.errstate(divide="ignore", invalid="ignore"):
+        if parmtype == "difference":
+            return x2 / n2 - x1 / n1
+        if parmtype == "ratio":
+            return float(np.float64(x2 / n2) / np.float64(x1 / n1))
+    return _odds_ratio(x1, n1, x2, n2)
+
+
+def _nuisance(
+    parmtype: str, delta0: float
+) -> Tuple[Callable[[np.ndarray], np.ndarray], float, float]:
+    """The null hypothesis as theta2 = g(theta1) for theta1 in [lo, hi].
+
+    Returns:
+        tuple: (g, lo, hi)
+    """
+    if parmtype == "difference":
+        return (lambda t: np.clip(t + delta0, 0.0, 1.0)), max(0.0, -delta0), min(1.0, 1.0 - delta0)
+    if parmtype == "ratio":
+        return (lambda t: np.clip(delta0 * t, 0.0, 1.0)), 0.0, min(1.0, 1.0 / delta0)
+    if parmtype == "oddsratio":
+        return _or_null(delta0), 0.0, 1.0
+    raise ValueError("parmtype must be 'difference', 'ratio' or 'oddsratio', got %r" % parmtype)
+
+
+@_array_cache
+def _null_grid(n1: int, n2: int, parmtype: str, delta0: float, npgrid: int):
+    "Nuisance grid over theta1 and the binomial probabilities on it under the null."
+    g, lo, hi = _nuisance(parmtype, delta0)
+    grid = np.linspace(lo, hi, npgrid)
+    return grid, _binom_pmf(n1, grid), _binom_pmf(n2, g(grid))
+
+
+def _constrained_mle(X1, N1, X2, N2, parmtype: str, delta0: float):
+    """Maximum likelihood estimates of (theta1, theta2) under the null
+    parameter value delta0 (Miettinen and Nurminen 1985)."""
+    with np.errstate(divide="ignore", invalid="ignore"):
+        if parmtype == "difference":
+            # Cubic of Farrington and Manning (1990) for theta2 - theta1 = delta0.
+            p2, p1 = X2 / N2, X1 / N1
+            theta = N1 / N2
+            a = 1 + theta
+            b = -(1 + theta + p2 + theta * p1 + delta0 * (theta + 2))
+            c = delta0 ** 2 + delta0 * (2 * p2 + theta + 1) + p2 + theta * p1
+            d = -p2 * delta0 * (1 + delta0)
+            v = b ** 3 / (27 * a ** 3) - b * c / (6 * a ** 2) + d / (2 * a)
+            r = np.sqrt(np.maximum(b ** 2 / (9 * a ** 2) - c / (3 * a), 0))
+            u = np.where(v >= 0, 1.0, -1.0) * r
+            w = (np.pi + np.arccos(np.clip(np.where(u == 0, 0.0, v / u ** 3), -1, 1))) / 3
+            t2 = np.clip(2 * u * np.cos(w) - b / (3 * a), 0.0, 1.0)
+            return np.clip(t2 - delta0, 0.0, 1.0), t2
+        if parmtype == "ratio":
+            a = (N1 + N2) * delta0
+            b = -(delta0 * (N2 + X1) + X2 + N1)
+            c = X1 + X2
+            t1 = np.clip((-b - np.sqrt(np.maximum(b ** 2 - 4 * a * c, 0))) / (2 * a), 0.0, 1.0)
+            return t1, np.clip(delta0 * t1, 0.0, 1.0)
+        # Odds ratio: n1 t1 + n2 t2 = x1 + x2 with the null odds ratio.
+        S = X1 + X2
+        A = N1 * (delta0 - 1)
+        B = N1 + N2 * delta0 - S * (delta0 - 1)
+        t1 = np.where(S == 0, 0.0, 2 * S / (B + np.sqrt(np.maximum(B ** 2 + 4 * A * S, 0))))
+        t1 = np.clip(t1, 0.0, 1.0)
+        return t1, _or_null(delta0)(t1)
+
+
+def _ratio_z(num, var):
+    "num / sqrt(var) with 0/0 as no evidence (0) and x/0 as +-inf."
+    with np.errstate(divide="ignore", invalid="ignore"):
+        z = num / np.sqrt(var)
+    return np.where(num == 0, 0.0, z)
+
+
+@_array_cache
+def _tstat(n1: int, n2: int, method: str, parmtype: str, delta0: float) -> np.ndarray:
+    """Ordering statistic of every table of the design, larger values suggesting
+    a larger parameter. NaN marks tables carrying no information about a
+    ratio or an odds ratio, which are never counted as extreme."""
+    return _tstat_table(n1, n2, method, parmtype, delta0)
+
+
+def _tstat_table(
+    n1: int, n2: int, method: str, parmtype: str, delta0: float, base=None
+) -> np.ndarray:
+    "Uncached ``_tstat``, with ``base`` as in ``_fisher_tables``."
+    X1 = np.arange(n1 + 1, dtype=float)[:, None]
+    X2 = np.arange(n2 + 1, dtype=float)[None, :]
+    p1, p2 = X1 / n1, X2 / n2
+    if method in ("wald-pooled", "wald-unpooled") and parmtype != "difference":
+        raise ValueError("method %s needs parmtype='difference'" % method)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        if method == "simple":
+            if parmtype == "difference":
+                T = p2 - p1 - delta0
+            elif parmtype == "ratio":
+                T = np.log(p2) - np.log(p1) - np.log(delta0)
+            else:
+                T = np.log(X2 * (n1 - X1)) - np.log(delta0 * X1 * (n2 - X2))
+        elif method == "wald-pooled":
+            p = (X1 + X2) / (n1 + n2)
+            T = _ratio_z(p2 - p1 - delta0, p * (1 - p) * (1 / n1 + 1 / n2))
+        elif method == "wald-unpooled":
+            T = _ratio_z(p2 - p1 - delta0, p1 * (1 - p1) / n1 + p2 * (1 - p2) / n2)
+        elif method == "score":
+            t1, t2 = _constrained_mle(X1, n1, X2, n2, parmtype, delta0)
+            v1, v2 = t1 * (1 - t1), t2 * (1 - t2)
+            if parmtype == "difference":
+                T = _ratio_z(p2 - p1 - delta0, v1 / n1 + v2 / n2)
+            elif parmtype == "ratio":
+                T = _ratio_z(p2 - delta0 * p1, v2 / n2 + delta0 ** 2 * v1 / n1)
+            else:
+                T = _ratio_z((p2 - t2) / v2 - (p1 - t1) / v1, 1 / (n2 * v2) + 1 / (n1 * v1))
+        elif method == "FisherAdj":
+            OR = delta0 if parmtype == "oddsratio" else 1.0
+            less, greater, _ = _fisher_tables(n1, n2, OR, minlike=False, base=base)
+            # One-sided mid-p value P(X2 < x2) + P(X2 = x2) / 2 given x1 + x2.
+            T = (less + 1 - greater) / 2
+        else:
+            raise ValueError("method %r is not supported by the numpy engine" % method)
+    T = np.broadcast_to(T, (n1 + 1, n2 + 1)).astype(float)
+
+    if parmtype != "difference":
+        T[0, 0] = np.nan
+        if parmtype == "oddsratio":
+            T[n1, n2] = np.nan
+    T.setflags(write=False)
+    return T
+
+
+def _tail_region(T: np.ndarray, t0: float, midp: bool) -> np.ndarray:
+    """Weights of the tables with T at least t0. Ties, up to a relative error,
+    count half when ``midp``."""
+    tol = 1e-7 * abs(t0) if np.isfinite(t0) else 0.0
+    ge = T >= t0 - tol
+    W = ge.astype(float)
+    if midp:
+        W -= 0.5 * (ge & (T <= t0 + tol))
+    return W
+
+
+def _uncond_pvalue(
+    x1: int,
+    n1: int,
+    x2: int,
+    n2: int,
+    parmtype: str,
+    delta0: float,
+    alternative: str,
+    method: str,
+    tsmethod: str,
+    midp: bool,
+    control: Dict,
+    level: Optional[float] = None,
+    design: Optional[Tuple] = None,
+) -> float:
+    """p-value of ``uncondExact2x2``. ``design`` is (T, grid, B1, B2) for the
+    design if already computed, otherwise taken from the caches."""
+    if design is None:
+        T = _tstat(n1, n2, method, parmtype, delta0)
+        grid, B1, B2 = _null_grid(n1, n2, parmtype, delta0, control["nPgrid"])
+    else:
+        T, grid, B1, B2 = design
+    if np.isnan(T[x1, x2]):
+        return 1.0
+    g, _, _ = _nuisance(parmtype, delta0)
+
+    def pvalue(W, level=level):
+        def f(t):
+            return _region_prob(W, _binom_pmf(n1, t), _binom_pmf(n2, g(t)))
+
+        return _bounded_supremum(W, f, grid, B1, B2, control, level)
+
+    if alternative == "greater":
+        return pvalue(_tail_region(T, T[x1, x2], midp))
+    if alternative == "less":
+        return pvalue(_tail_region(-T, -T[x1, x2], midp))
+    if alternative != "two.sided":
+        raise ValueError(
+            "alternative must be 'two.sided', 'less' or 'greater', got %r" % alternative
+        )
+    if tsmethod == "central":
+        half = None if level is None else level / 2
+        p_hi = pvalue(_tail_region(T, T[x1, x2], midp), half)
+        p_lo = pvalue(_tail_region(-T, -T[x1, x2], midp), half)
+        return min(1.0, 2 * min(p_hi, p_lo))
+    if tsmethod == "square":
+        if method == "FisherAdj":
+            raise ValueError("tsmethod='square' is not defined for method='FisherAdj'")
+        return pvalue(_tail_region(T ** 2, T[x1, x2] ** 2, midp))
+    raise ValueError("tsmethod must be 'central' or 'square', got %r" % tsmethod)
+
+
+def _tail_probs(S: np.ndarray, B1: np.ndarray, B2: np.ndarray, cells: np.ndarray, midp: bool):
+    """Probabilities on the grid of the regions ``_tail_region(S, s, midp)``
+    for s the statistic of each of the flat ``cells``, from one cumulative sum
+    over the tables sorted by decreasing S.
+
+    Returns:
+        tuple: (probabilities with one column per cell, region keys equal for
+        cells with the same region)
+    """
+    flat = S.ravel()
+    valid = np.flatnonzero(~np.isnan(flat))
+    order = valid[np.argsort(-flat[valid], kind="stable")]
+    ascending = -flat[order]
+    P = (B1[:, :, None] * B2[:, None, :]).reshape(len(B1), -1)[:, order]
+    C = np.concatenate([np.zeros((len(P), 1)), np.cumsum(P, axis=1)], axis=1)
+    s0 = flat[cells]
+    tol = np.where(np.isfinite(s0), 1e-7 * np.abs(s0), 0.0)
+    end = np.searchsorted(ascending, -(s0 - tol), side="right")
+    probs = C[:, end]
+    if not midp:
+        return probs, end
+    start = np.searchsorted(ascending, -(s0 + tol), side="left")
+    probs = probs - 0.5 * (probs - C[:, start])
+    return probs, end * (len(flat) + 1) + start
+
+
+def _uncond_pvalues(
+    x1: np.ndarray,
+    n1: int,
+    x2: np.ndarray,
+    n2: int,
+    parmtype: str,
+    delta0: float,
+    alternative: str,
+    method: str,
+    tsmethod: str,
+    midp: bool,
+    control: Dict,
+) -> np.ndarray:
+    """p-values of ``uncondExact2x2`` for the tables (x1[i], n1, x2[i], n2) of
+    one design. The region probabilities on the grid come from one pass over
+    the sample space, and the supremum is refined once per distinct region."""
+    T = _tstat(n1, n2, method, parmtype, delta0)
+    grid, B1, B2 = _null_grid(n1, n2, parmtype, delta0, control["nPgrid"])
+    g, _, _ = _nuisance(parmtype, delta0)
+    cells = np.asarray(x1) * (n2 + 1) + np.asarray(x2)
+
+    def pvalues(S):
+        values, keys = _tail_probs(S, B1, B2, cells, midp)
+        _, first, inverse = np.unique(keys, return_index=True, return_inverse=True)
+        out = np.empty(len(first))
+        for i, j in enumerate(first):
+            W = _tail_region(S, S.flat[cells[j]], midp)
+
+            def f(t):
+                return _region_prob(W, _binom_pmf(n1, t), _binom_pmf(n2, g(t)))
+
+            out[i] = _supremum(f, grid, values[:, j], control["adaptive"], control["ptol"])[0]
+        return out[np.ravel(inverse)]
+
+    if alternative == "greater":
+        p = pvalues(T)
+    elif alternative == "less":
+        p = pvalues(-T)
+    elif alternative != "two.sided":
+        raise ValueError(
+            "alternative must be 'two.sided', 'less' or 'greater', got %r" % alternative
+        )
+    elif tsmethod == "central":
+        p = np.minimum(1.0, 2 * np.minimum(pvalues(T), pvalues(-T)))
+    elif tsmethod == "square":
+        if method == "FisherAdj":
+            raise ValueError("tsmethod='square' is not defined for method='FisherAdj'")
+        p = pvalues(T ** 2)
+    else:
+        raise ValueError("tsmethod must be 'central' or 'square', got %r" % tsmethod)
+    p[np.isnan(T.flat[cells])] = 1.0
+    return p
+
+
+def uncondExact2x2(
+    x1: int,
+    n1: int,
+    x2: int,
+    n2: int,
+    parmtype: str = "difference",
+    nullparm: float = None,
+    alternative: str = "two.sided",
+    conf_level: float = 0.95,
+    method: str = "FisherAdj",
+    tsmethod: str = "central",
+    midp: bool = False,
+    gamma: float = 0.0,
+    EplusM: bool = False,
+    tiebreak: bool = False,
+    conf_int: bool = False,
+    control: Optional[Dict] = None,
+    level: Optional[float] = None,
+) -> Result:
+    """``uncondExact2x2`` without R for the built-in orderings "simple",
+    "wald-pooled", "wald-unpooled", "score" and "FisherAdj".
+
+    The Berger-Boos (gamma), E+M and tiebreak adjustments and the confidence
+    interval are not available. With a ``level`` the p-value is exact only
+    when it is below the level and is otherwise some lower bound of at least
+    the level, which is enough to decide significance and often much cheaper.
+    """
+    assert 0 <= x1 <= n1
+    assert 0 <= x2 <= n2
+    if gamma > 0 or EplusM or tiebreak:
+        raise ValueError("gamma, EplusM and tiebreak are not supported by the numpy engine")
+    if conf_int:
+        raise ValueError("conf_int is not supported by the numpy engine of uncondExact2x2")
+    if nullparm is None:
+        nullparm = 0.0 if parmtype == "difference" else 1.0
+    p_value = _uncond_pvalue(
+        x1,
+        n1,
+        x2,
+        n2,
+        parmtype,
+        float(nullparm),
+        alternative,
+        method,
+        tsmethod,
+        midp,
+        _control.resolve(control),
+        level,
+    )
+    return _uncond_result(x1, n1, x2, n2, parmtype, float(nullparm), alternative, method, p_value)
+
+
+def _uncond_result(
+    x1: int,
+    n1: int,
+    x2: int,
+    n2: int,
+    parmtype: str,
+    nullparm: float,
+    alternative: str,
+    method: str,
+    p_value: float,
+) -> Result:
+    return Result(
+        p_value=float(p_value),
+        estimate=_estimate(x1, n1, x2, n2, parmtype),
+        statistic=x1 / n1,
+        parameter=x2 / n2,
+        null_value=nullparm,
+        alternative=alternative,
+        method="Unconditional Exact Test, method=%s, parmtype=%s" % (method, parmtype),
+        data_name="x1/n1=(%d/%d) and x2/n2= (%d/%d)" % (x1, n1, x2, n2),
+    )
+
+
+def _boschloo_pvalue(
+    x1: int,
+    n1: int,
+    x2: int,
+    n2: int,
+    alternative: str,
+    OR: float,
+    midp: bool,
+    tsmethod: str,
+    control: Dict,
+    level: Optional[float] = None,
+    design: Optional[Tuple] = None,
+) -> float:
+    """p-value of ``boschloo``. ``design`` is ((less, greater, minlike), grid,
+    B1, B2) as in ``_uncond_pvalue``."""
+    if design is None:
+        less, greater, minlike = _fisher_pvalues(n1, n2, OR)
+        grid, B1, B2 = _null_grid(n1, n2, "oddsratio", OR, control["nPgrid"])
+    else:
+        (less, greater, minlike), grid, B1, B2 = design
+    theta2 = _or_null(OR)
+
+    def pvalue(T, level=level):
+        W = _region(T, T[x1, x2], midp)
+
+        def f(t):
+            return _region_prob(W, _binom_pmf(n1, t), _binom_pmf(n2, theta2(t)))
+
+        return _bounded_supremum(W, f, grid, B1, B2, control, level)
+
+    if alternative == "less":
+        return pvalue(less)
+    if alternative == "greater":
+        return pvalue(greater)
+    if alternative != "two.sided":
+        raise ValueError(
+            "alternative must be 'two.sided', 'less' or 'greater', got %r" % alternative
+        )
+    if tsmethod == "central":
+        half = None if level is None else level / 2
+        return min(1.0, 2 * min(pvalue(less, half), pvalue(greater, half)))
+    if tsmethod == "minlike":
+        return pvalue(minlike)
+    raise ValueError("tsmethod must be 'central' or 'minlike', got %r" % tsmethod)
+
+
+# Confidence limits beyond exp(+-_LOG_OR_BOUND) are reported as 0 or inf.
+_LOG_OR_BOUND = np.log(1e10)
+
+
+def _bisect(inside: Callable[[float], bool], outside: float, inner: float, tol: float) -> float:
+    "Boundary between a point outside and a point inside a region, to within tol."
+    while abs(inner - outside) > tol:
+        mid = (inner + outside) / 2
+        if inside(mid):
+            inner = mid
+        else:
+            outside = mid
+    return (inner + outside) / 2
+
+
+def _bracket(
+    inside: Callable[[float], bool], guess: float, outside: float, inner: float, step: float = 0.25
+) -> Tuple[float, float]:
+    """Narrow the ``_bisect`` bracket (outside, inner) to one around ``guess``,
+    a boundary expected nearby such as the limit for slightly different
+    counts. The bracket grows geometrically from the guess until it contains
+    the boundary, so a wrong guess only costs a few evaluations."""
+    if not min(outside, inner) < guess < max(outside, inner):
+        return outside, inner
+    toward = np.sign(outside - inner)
+    if inside(guess):
+        near = guess
+        while True:
+            probe = near + toward * step
+            if (probe - outside) * toward >= 0:
+                return outside, near
+            if not inside(probe):
+                return probe, near
+            near, step = probe, 2 * step
+    near = guess
+    while True:
+        probe = near - toward * step
+        if (probe - inner) * toward <= 0:
+            return near, inner
+        if inside(probe):
+            return near, probe
+        near, step = probe, 2 * step
+
+
+def _boschloo_ci(
+    x1: int,
+    n1: int,
+    x2: int,
+    n2: int,
+    alternative: str,
+    conf_level: float,
+    midp: bool,
+    tsmethod: str,
+    control: Dict,
+    B1: Optional[np.ndarray] = None,
+    base=None,
+    start: Optional[Tuple[float, float]] = None,
+) -> Tuple[float, float]:
+    """Confidence interval for the odds ratio by inverting Boschloo's test.
+
+    The limits are found by bisection on the log odds ratio to within
+    ``errbound``. Every step reuses the hypergeometric weights of the design
+    and the group 1 probabilities on the nuisance grid, and only refines the
+    supremum when the grid maximum alone does not decide whether the p-value
+    exceeds the significance level. One-sided p-values are taken to be
+    monotone in the odds ratio; for ``tsmethod="minlike"`` the interval is the
+    range around the estimate where the p-value stays above the level.
+
+    The group 1 probabilities ``B1`` on the nuisance grid and the
+    hypergeometric ``base`` of the design are looked up when not given. With
+    ``start``, limits of a nearby interval, the bisections begin from small
+    brackets around them.
+    """
+    if B1 is None:
+        grid, B1, _ = _null_grid(n1, n2, "oddsratio", 1.0, control["nPgrid"])
+    else:
+        grid = np.linspace(0.0, 1.0, control["nPgrid"])
+    alpha = 1 - conf_level
+
+    def exceeds(log_or: float, side: str, level: float) -> bool:
+        psi = np.exp(log_or)
+        less, greater, minlike = _fisher_tables(n1, n2, psi, side == "minlike", base)
+        T = {"less": less, "greater": greater, "minlike": minlike}[side]
+        W = _region(T, T[x1, x2], midp)
+        theta2 = _or_null(psi)
+        values = _region_prob(W, B1, _binom_pmf(n2, theta2(grid)))
+        # The grid maximum is a lower bound of the supremum.
+        if values.max() > level:
+            return True
+
+        def f(t):
+            return _region_prob(W, _binom_pmf(n1, t), _binom_pmf(n2, theta2(t)))
+
+        return _supremum(f, grid, values, control["adaptive"], control["ptol"])[0] > level
+
+    guess = (np.nan, np.nan) if start is None else start
+
+    def limit(side: str, level: float, outside: float, inner: float, near: float):
+        "The limit between outside and inner, None if outside is inside too."
+        inside = lambda u: exceeds(u, side, level)
+        if inside(outside):
+            return None
+        if 0 < near < np.inf:
+            outside, inner = _bracket(inside, np.log(near), outside, inner)
+        return float(np.exp(_bisect(inside, outside, inner, control["errbound"])))
+
+    def lower(side: str, level: float, inner: float) -> float:
+        value = limit(side, level, -_LOG_OR_BOUND, inner, guess[0])
+        return 0.0 if value is None else value
+
+    def upper(side: str, level: float, inner: float) -> float:
+        value = limit(side, level, _LOG_OR_BOUND, inner, guess[1])
+        return np.inf if value is None else value
+
+    if alternative == "less":
+        return 0.0, upper("less", alpha, -_LOG_OR_BOUND)
+    if alternative == "greater":
+        return lower("greater", alpha, _LOG_OR_BOUND), np.inf
+    if tsmethod == "central":
+        return (
+            lower("greater", alpha / 2, _LOG_OR_BOUND),
+            upper("less", alpha / 2, -_LOG_OR_BOUND),
+        )
+    with np.errstate(divide="ignore"):
+        start = np.clip(np.log(_odds_ratio(x1, n1, x2, n2)), -_LOG_OR_BOUND, _LOG_OR_BOUND)
+    if np.isnan(start) or not exceeds(start, "minlike", alpha):
+        return np.nan, np.nan
+    return lower("minlike", alpha, start), upper("minlike", alpha, start)
+
+
+def boschloo(
+    x1: int,
+    n1: int,
+    x2: int,
+    n2: int,
+    alternative: str = "two.sided",
+    OR: float = 1.0,
+    conf_int: bool = False,
+    conf_level: float = 0.95,
+    midp: bool = False,
+    tsmethod: str = "central",
+    control: Optional[Dict] = None,
+    level: Optional[float] = None,
+) -> Result:
+    """Boschloo's test without R, returning a ``Result`` like ``pyrexact2x2.boschloo``.
+
+    With ``conf_int`` the confidence interval for the odds ratio is computed
+    by ``_boschloo_ci``. ``level`` is as in ``uncondExact2x2``.
+    """
+    assert 0 <= x1 <= n1
+    assert 0 <= x2 <= n2
+    if OR is None:
+        OR = 1.0
+    control = _control.resolve(control)
+    p_value = _boschloo_pvalue(
+        x1, n1, x2, n2, alternative, float(OR), midp, tsmethod, control, level
+    )
+    ci = (np.nan, np.nan)
+    if conf_int:
+        ci = _boschloo_ci(x1, n1, x2, n2, alternative, conf_level, midp, tsmethod, control)
+    return _boschloo_result(x1, n1, x2, n2, alternative, float(OR), midp, p_value, ci)
+
+
+def _boschloo_result(
+    x1: int,
+    n1: int,
+    x2: int,
+    n2: int,
+    alternative: str,
+    OR: float,
+    midp: bool,
+    p_value: float,
+    ci: Tuple[float, float],
+) -> Result:
+    return Result(
+        p_value=float(p_value),
+        ci_low=float(ci[0]),
+        ci_high=float(ci[1]),
+        estimate=_odds_ratio(x1, n1, x2, n2),
+        statistic=x1 / n1,
+        parameter=x2 / n2,
+        null_value=OR,
+        alternative=alternative,
+        method="Boschloo's test" + (" (mid-p version)" if midp else ""),
+        data_name="x1/n1=(%d/%d) and x2/n2= (%d/%d)" % (x1, n1, x2, n2),
+    )
@@ -0,0 +1,189 @@
+"""Process pool with one embedded R session per worker.
+
+Embedded R is single threaded, so parallelism has to come from processes.
+Each worker starts R and loads exact2x2 once, then evaluates chunks of tables
+through the batch path.
+"""
+import multiprocessing
+import os
+from collections import deque
+from typing import Dict, Iterable, Iterator, Optional, Tuple
+
+import numpy as np
+
+from ._batch import _broadcast, boschloo_many, uncondExact2x2_many
+from ._result import BatchResult
+from ._session import get_session
+
+_TESTS = {"uncondExact2x2": uncondExact2x2_many, "boschloo": boschloo_many}
+
+
+# Why R failed to start in this worker, None if it started. multiprocessing
+# replaces a worker whose initializer raises, which would retry forever, so
+# the failure is raised by the tasks instead.
+_init_error = None
+
+
+def _init_worker():
+    global _init_error
+    try:
+        get_session().init()
+    except Exception as e:
+        _init_error = "%s: %s" % (type(e).__name__, e)
+
+
+def _run_chunk(task):
+    if _init_error is not None:
+        raise RuntimeError("R could not be started in the pool worker: " + _init_error)
+    test, start, cols = task
+    return start, _TESTS[test](**cols)
+
+
+def _tasks(test, x1, n1, x2, n2, chunksize, workers, options):
+    """Split a batch into ``_run_chunk`` tasks; chunksize None gives about four
+    chunks per worker."""
+    if test not in _TESTS:
+        raise ValueError("Unknown test %r, expected one of %s" % (test, list(_TESTS)))
+    cols = _broadcast(x1=x1, n1=n1, x2=x2, n2=n2, **options)
+    m = len(cols["x1"])
+    chunksize = chunksize or max(1, -(-m // (4 * workers)))
+    return [
+        (test, start, {k: v[start:start + chunksize] for k, v in cols.items()})
+        for start in range(0, m, chunksize)
+    ]
+
+
+class Pool:
+    """Evaluate batches of 2x2 tables on several worker processes.
+
+    Args:
+        workers: Number of worker processes. Defaults to ``os.cpu_count()``.
+        chunksize: Default number of tables sent to a worker at a time. When
+            None, each batch is split into about four chunks per worker.
+        context: multiprocessing start method. "spawn" is the default since
+            a forked copy of an initialised R is not usable.
+
+    When R cannot be started in the workers, every task raises RuntimeError
+    with the reason.
+
+    The pool is a context manager::
+
+        with pyrexact2x2.Pool(workers=8) as pool:
+            res = pool.map(x1, n1, x2, n2, method="score")
+    """
+
+    def __init__(
+        self, workers: Optional[int] = None, chunksize: Optional[int] = None, context: str = "spawn"
+    ):
+        self.workers = workers or os.cpu_count() or 1
+        self.chunksize = chunksize
+        ctx = multiprocessing.get_context(context)
+        self._pool = ctx.Pool(self.workers, initializer=_init_worker)
+
+    def _tasks(self, test, x1, n1, x2, n2, chunksize, options):
+        chunksize = chunksize or self.chunksize
+        return _tasks(test, x1, n1, x2, n2, chunksize, self.workers, options)
+
+    def map(
+        self,
+        x1,
+        n1,
+        x2,
+        n2,
+        test: str = "uncondExact2x2",
+        chunksize: Optional[int] = None,
+        **options
+    ) -> BatchResult:
+        """Parallel version of ``uncondExact2x2_many``/``boschloo_many``.
+
+        Args:
+            x1, n1, x2, n2: Counts of the tables, scalars or arrays.
+            test: "uncondExact2x2" or "boschloo".
+            chunksize: Tables per task, overrides the pool default.
+            **options: Options of the test, scalars or per table arrays.
+
+        Returns:
+            BatchResult: Results in the order of the input tables.
+        """
+        tasks = self._tasks(test, x1, n1, x2, n2, chunksize, options)
+        return BatchResult.concatenate(res for _, res in self._pool.imap(_run_chunk, tasks))
+
+    def imap(
+        self,
+        x1,
+        n1,
+        x2,
+        n2,
+        test: str = "uncondExact2x2",
+        chunksize: Optional[int] = None,
+        **options
+    ) -> Iterator[Tuple[np.ndarray, BatchResult]]:
+        """Like ``map`` but yields ``(indices, results)`` one chunk at a time in
+        input order."""
+        tasks = self._tasks(test, x1, n1, x2, n2, chunksize, options)
+        for start, res in self._pool.imap(_run_chunk, tasks):
+            yield np.arange(start, start + len(res)), res
+
+    def imap_unordered(
+        self,
+        x1,
+        n1,
+        x2,
+        n2,
+        test: str = "uncondExact2x2",
+        chunksize: Optional[int] = None,
+        **options
+    ) -> Iterator[Tuple[np.ndarray, BatchResult]]:
+        """Like ``imap`` but yields chunks as soon as they complete. The
+        indices locate the chunk's tables in the input."""
+        tasks = self._tasks(test, x1, n1, x2, n2, chunksize, options)
+        for start, res in self._pool.imap_unordered(_run_chunk, tasks):
+            yield np.arange(start, start + len(res)), res
+
+    def imap_chunks(
+        self,
+        chunks: Iterable[Dict],
+        test: str = "uncondExact2x2",
+        max_pending: Optional[int] = None,
+        **options
+    ) -> Iterator[BatchResult]:
+        """Evaluate a stream of batches, yielding their results in order.
+
+        Unlike ``imap``, which splits one batch held in memory, the input is
+        consumed lazily: at most ``max_pending`` chunks (default twice the
+        number of workers) are read ahead of the last one yielded, so memory
+        stays bounded for inputs of any length.
+
+        Args:
+            chunks: Iterable of dicts with the count arrays "x1", "n1", "x2"
+                and "n2" of each chunk, and optionally per table options.
+            test: "uncondExact2x2" or "boschloo".
+            max_pending: Chunks submitted to the workers at a time.
+            **options: Options of the test common to all chunks.
+        """
+        if test not in _TESTS:
+            raise ValueError("Unknown test %r, expected one of %s" % (test, list(_TESTS)))
+        max_pending = max_pending or 2 * self.workers
+        pending = deque()
+        for chunk in chunks:
+            task = (test, 0, dict(options, **chunk))
+            pending.append(self._pool.apply_async(_run_chunk, (task,)))
+            if len(pending) >= max_pending:
+                yield pending.popleft().get()[1]
+        while pending:
+            yield pending.popleft().get()[1]
+
+    def close(self) -> None:
+        self._pool.close()
+
+    def terminate(self) -> None:
+        self._pool.terminate()
+
+    def join(self) -> None:
+        self._pool.join()
+
+    def __enter__(self) -> "Pool":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.terminate()
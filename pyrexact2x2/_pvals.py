@@ -0,0 +1,127 @@
+"""P-values over the whole sample space of a design via uncondExact2x2Pvals."""
+from typing import Dict
+
+import numpy as np
+
+from ._batch import _broadcast, _check_counts, _run_batch, _to_r_vector, _uncond_options
+from ._session import get_session
+
+
+def _pvals_matrix(n1: int, n2: int, options: Dict) -> np.ndarray:
+    session = get_session().init()
+    kwargs = {k: _to_r_vector(np.asarray([v])) for k, v in options.items()}
+    res = session.exact2x2.uncondExact2x2Pvals(n1, n2, **kwargs)
+    # R matrices iterate in column major order.
+    pvals = np.fromiter(res, dtype=float, count=(n1 + 1) * (n2 + 1))
+    return pvals.reshape(n2 + 1, n1 + 1).T
+
+
+def uncondExact2x2Pvals(
+    n1: int,
+    n2: int,
+    parmtype: str = "difference",
+    nullparm=None,
+    alternative: str = "two.sided",
+    method: str = "FisherAdj",
+    tsmethod: str = "central",
+    midp: bool = False,
+    gamma: float = 0.0,
+    EplusM: bool = False,
+    tiebreak: bool = False,
+) -> np.ndarray:
+    """P-values of ``uncondExact2x2`` for every possible outcome of a design.
+
+    Args:
+        n1, n2: Sample sizes of the two groups.
+        Others: As in ``uncondExact2x2``.
+
+    Returns:
+        np.ndarray: (n1+1) x (n2+1) array whose element [x1, x2] is the p-value
+        of the table (x1, n1, x2, n2).
+    """
+    cols = _broadcast(
+        parmtype=parmtype,
+        nullparm=np.nan if nullparm is None else nullparm,
+        alternative=alternative,
+        method=method,
+        tsmethod=tsmethod,
+        midp=midp,
+        gamma=gamma,
+        EplusM=EplusM,
+        tiebreak=tiebreak,
+    )
+    options = {k: v[0].item() for k, v in _uncond_options(cols).items()}
+    return _pvals_matrix(int(n1), int(n2), options)
+
+
+def uncondExact2x2_pvalues(
+    x1,
+    n1,
+    x2,
+    n2,
+    parmtype="difference",
+    nullparm=None,
+    alternative="two.sided",
+    method="FisherAdj",
+    tsmethod="central",
+    midp=False,
+    gamma=0.0,
+    EplusM=False,
+    tiebreak=False,
+    engine="R",
+    control=None,
+) -> np.ndarray:
+    """P-values of ``uncondExact2x2`` for arrays of tables.
+
+    With the R engine this is ``uncondExact2x2_many(...).p_value``, one batch
+    call testing the distinct tables. The numpy engine groups the tables by
+    design and options and computes the p-values of a group in one pass over
+    its sample space, refining the supremum once per distinct region, which
+    is cheaper than testing the tables one by one.
+
+    Arguments are as in ``uncondExact2x2_many``, scalars or one per table.
+    ``engine`` and ``control`` are as in ``uncondExact2x2``; the R engine uses
+    the default control settings.
+
+    Returns:
+        np.ndarray: p-value of each table.
+    """
+    cols = _broadcast(
+        x1=x1,
+        n1=n1,
+        x2=x2,
+        n2=n2,
+        parmtype=parmtype,
+        nullparm=np.nan if nullparm is None else nullparm,
+        alternative=alternative,
+        method=method,
+        tsmethod=tsmethod,
+        midp=midp,
+        gamma=gamma,
+        EplusM=EplusM,
+        tiebreak=tiebreak,
+    )
+    _check_counts(cols)
+    options = _uncond_options(cols)
+    if engine == "R":
+        return _run_batch("uncondExact2x2", cols, options).p_value
+    if engine != "numpy":
+        raise ValueError("engine must be 'R' or 'numpy', got %r" % engine)
+    if np.any(options["gamma"] > 0) or np.any(options["EplusM"]) or np.any(options["tiebreak"]):
+        raise ValueError("gamma, EplusM and tiebreak are not supported by the numpy engine")
+    from . import _control, _numpy_engine
+
+    control = _control.resolve(control)
+    out = np.empty(len(cols["x1"]), dtype=float)
+    if len(out) == 0:
+        return out
+    keys = ("parmtype", "nullparm", "alternative", "method", "tsmethod", "midp")
+    design = np.rec.fromarrays([cols["n1"], cols["n2"]] + [options[k] for k in keys])
+    groups, inverse, counts = np.unique(design, return_inverse=True, return_counts=True)
+    members = np.split(np.argsort(np.ravel(inverse), kind="stable"), np.cumsum(counts)[:-1])
+    for group, idx in zip(groups, members):
+        size1, size2, *group_options = group.tolist()
+        out[idx] = _numpy_engine._uncond_pvalues(
+            cols["x1"][idx], size1, cols["x2"][idx], size2, *group_options, control
+        )
+    return out
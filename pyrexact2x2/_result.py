@@ -0,0 +1,263 @@
+"""Compact containers for test results.
+
+``Result`` holds one test result in typed slots instead of a dict, and
+``BatchResult`` holds the results of a batch as float columns. Both still
+accept the R field names of the htest object ("p.value", "conf.int", ...) as
+keys, so code written against the former dict results keeps working.
+"""
+from collections.abc import Mapping
+from typing import Dict, Iterable, Iterator, Tuple
+
+# R htest names of the scalar fields and their attribute names.
+_FIELDS = {
+    "statistic": "statistic",
+    "parameter": "parameter",
+    "p.value": "p_value",
+    "estimate": "estimate",
+    "null.value": "null_value",
+    "alternative": "alternative",
+    "method": "method",
+    "data.name": "data_name",
+}
+_KEYS = (
+    "statistic",
+    "parameter",
+    "p.value",
+    "conf.int",
+    "estimate",
+    "null.value",
+    "alternative",
+    "method",
+    "data.name",
+)
+
+NAN = float("nan")
+
+
+class Result(Mapping):
+    """Result of ``uncondExact2x2`` or ``boschloo``.
+
+    The fields are attributes, and the R names are keys: ``res.p_value`` and
+    ``res["p.value"]`` are the same value, and ``res["conf.int"]`` is the pair
+    ``(res.ci_low, res.ci_high)``.
+    """
+
+    __slots__ = (
+        "p_value",
+        "ci_low",
+        "ci_high",
+        "estimate",
+        "statistic",
+        "parameter",
+        "null_value",
+        "alternative",
+        "method",
+        "data_name",
+    )
+
+    def __init__(
+        self,
+        p_value: float = NAN,
+        ci_low: float = NAN,
+        ci_high: float = NAN,
+        estimate: float = NAN,
+        statistic: float = NAN,
+        parameter: float = NAN,
+        null_value: float = NAN,
+        alternative: str = "",
+        method: str = "",
+        data_name: str = "",
+    ):
+        self.p_value = p_value
+        self.ci_low = ci_low
+        self.ci_high = ci_high
+        self.estimate = estimate
+        self.statistic = statistic
+        self.parameter = parameter
+        self.null_value = null_value
+        self.alternative = alternative
+        self.method = method
+        self.data_name = data_name
+
+    @classmethod
+    def from_htest(cls, items: Iterable) -> "Result":
+        "Build a result from the (name, R vector) items of an R htest object."
+        out = cls()
+        for k, v in items:
+            if k == "conf.int":
+                if len(v) > 1:
+                    out.ci_low, out.ci_high = float(v[0]), float(v[1])
+            elif k in _FIELDS:
+                setattr(out, _FIELDS[k], v[0])
+        return out
+
+    @classmethod
+    def from_dict(cls, d: Dict) -> "Result":
+        "Inverse of ``to_dict``."
+        out = cls()
+        for k, v in d.items():
+            out[k] = v
+        return out
+
+    def __getitem__(self, key: str):
+        if key == "conf.int":
+            return (self.ci_low, self.ci_high)
+        if key in _FIELDS:
+            return getattr(self, _FIELDS[key])
+        raise KeyError(key)
+
+    def __setitem__(self, key: str, value) -> None:
+        if key == "conf.int":
+            self.ci_low, self.ci_high = value
+        elif key in _FIELDS:
+            setattr(self, _FIELDS[key], value)
+        else:
+            raise KeyError(key)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(_KEYS)
+
+    def __len__(self) -> int:
+        return len(_KEYS)
+
+    def __repr__(self) -> str:
+        return "Result(%s)" % ", ".join("%s=%r" % (k, getattr(self, k)) for k in self.__slots__)
+
+    def __reduce__(self):
+        return (Result, self.astuple())
+
+    def astuple(self) -> Tuple:
+        return tuple(getattr(self, k) for k in self.__slots__)
+
+    def copy(self) -> "Result":
+        return Result(*self.astuple())
+
+    def to_dict(self) -> Dict:
+        "The result as a dict keyed by the R field names."
+        return {k: self[k] for k in _KEYS}
+
+
+# Columns of a batch: R style name and attribute name.
+BATCH_FIELDS = (
+    ("p.value", "p_value"),
+    ("conf.int.low", "ci_low"),
+    ("conf.int.high", "ci_high"),
+    ("estimate", "estimate"),
+)
+_BATCH_INDEX = {k: i for i, names in enumerate(BATCH_FIELDS) for k in names}
+
+
+class BatchResult:
+    """Results of a batch of tests as float columns.
+
+    The columns ``p_value``, ``ci_low``, ``ci_high`` and ``estimate`` are
+    rows of one (4, m) float array, 32 bytes per table. Columns are available
+    as attributes or by their R style names ("p.value", "conf.int.low",
+    "conf.int.high", "estimate"), which are also the keys when iterating like
+    over a dict. An integer index returns the ``Result`` of one table, and
+    ``len`` is the number of tables.
+
+    Args:
+        data: (4, m) float array with the columns in the order above.
+    """
+
+    __slots__ = ("data",)
+
+    def __init__(self, data):
+        import numpy as np
+
+        data = np.asarray(data, dtype=float)
+        assert data.ndim == 2 and data.shape[0] == len(BATCH_FIELDS), "Need a (4, m) array"
+        self.data = data
+
+    @classmethod
+    def empty(cls, m: int = 0) -> "BatchResult":
+        "A batch of m tables with every value NaN."
+        import numpy as np
+
+        return cls(np.full((len(BATCH_FIELDS), m), np.nan))
+
+    @classmethod
+    def concatenate(cls, parts: Iterable["BatchResult"]) -> "BatchResult":
+        import numpy as np
+
+        parts = [p.data for p in parts]
+        return cls(np.concatenate(parts, axis=1)) if parts else cls.empty()
+
+    @property
+    def p_value(self):
+        return self.data[0]
+
+    @property
+    def ci_low(self):
+        return self.data[1]
+
+    @property
+    def ci_high(self):
+        return self.data[2]
+
+    @property
+    def estimate(self):
+        return self.data[3]
+
+    def __getitem__(self, key):
+        if isinstance(key, str):
+            try:
+                return self.data[_BATCH_INDEX[key]]
+            except KeyError:
+                raise KeyError(key) from None
+        p_value, ci_low, ci_high, estimate = self.data[:, key].tolist()
+        return Result(p_value, ci_low, ci_high, estimate)
+
+    def __contains__(self, key) -> bool:
+        return key in _BATCH_INDEX
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.keys())
+
+    def __len__(self) -> int:
+        return self.data.shape[1]
+
+    def __repr__(self) -> str:
+        return "BatchResult(%d tables)" % len(self)
+
+    def __getstate__(self):
+        return self.data
+
+    def __setstate__(self, data) -> None:
+        self.data = data
+
+    def keys(self) -> Tuple[str, ...]:
+        return tuple(name for name, _ in BATCH_FIELDS)
+
+    def values(self):
+        return list(self.data)
+
+    def items(self):
+        return list(zip(self.keys(), self.data))
+
+    @property
+    def nbytes(self) -> int:
+        return self.data.nbytes
+
+    def to_records(self):
+        "The batch as a NumPy structured array with one record per table."
+        import numpy as np
+
+        out = np.empty(len(self), dtype=[(attr, float) for _, attr in BATCH_FIELDS])
+        for i, (_, attr) in enumerate(BATCH_FIELDS):
+            out[attr] = self.data[i]
+        return out
+
+    def to_frame(self, index=None, names: str = "R"):
+        """The batch as a pandas DataFrame.
+
+        Args:
+            index: Index of the frame, e.g. that of the input tables.
+            names: "R" for the column names "p.value", "conf.int.low", ...,
+                or "python" for "p_value", "ci_low", ...
+        """
+        import pandas as pd
+
+        columns = [name if names == "R" else attr for name, attr in BATCH_FIELDS]
+        return pd.DataFrame(dict(zip(columns, self.data)), index=index)
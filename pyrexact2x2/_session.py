@@ -0,0 +1,150 @@
+"""Persistent embedded R session holding the exact2x2 function handles.
+
+Embedded R can only be started once per process, so the handles are resolved
+on first use and kept for the lifetime of the process instead of running
+``importr("exact2x2")`` on every call.
+"""
+import threading
+from typing import Dict
+
+# Evaluates one exact2x2 test per element of the count vectors in a single R
+# call. `args` is a named list of option vectors, each either of length one or
+# of the same length as the counts.
+_BATCH_R = """
+function(test, x1, n1, x2, n2, args) {
+    f <- get(test, envir = asNamespace("exact2x2"))
+    m <- length(x1)
+    out <- matrix(NA_real_, nrow = m, ncol = 4)
+    for (i in seq_len(m)) {
+        a <- lapply(args, function(v) v[[(i - 1) %% length(v) + 1]])
+        r <- do.call(f, c(list(x1[i], n1[i], x2[i], n2[i]), a))
+        ci <- if (is.null(r$conf.int)) c(NA_real_, NA_real_) else r$conf.int
+        out[i, ] <- c(r$p.value, ci[1], ci[2], r$estimate[1])
+    }
+    out
+}
+"""
+BATCH_COLUMNS = ("p.value", "conf.int.low", "conf.int.high", "estimate")
+
+
+class RSession:
+    """Owner of the embedded R interpreter and the exact2x2 package handles.
+
+    The session is initialised lazily: the first access to ``exact2x2`` (or an
+    explicit ``init()``) starts R and loads the package. All public entry
+    points of pyrexact2x2 share the session returned by ``get_session()``.
+    """
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._exact2x2 = None
+        self.uncondExact2x2 = None
+        self.boschloo = None
+        self.batch = None
+
+    @property
+    def initialized(self) -> bool:
+        return self._exact2x2 is not None
+
+    @property
+    def exact2x2(self):
+        "The exact2x2 R package, initialising the session if needed."
+        if self._exact2x2 is None:
+            self.init()
+        return self._exact2x2
+
+    def init(self) -> "RSession":
+        """Start embedded R and resolve the exact2x2 function handles.
+
+        Calling ``init()`` on an initialised session is a no-op.
+        """
+        with self._lock:
+            if self._exact2x2 is None:
+                from logging import info
+
+                from rpy2 import robjects
+                from rpy2.robjects.packages import importr
+
+                exact2x2 = importr("exact2x2")
+                self.uncondExact2x2 = exact2x2.uncondExact2x2
+                self.boschloo = exact2x2.boschloo
+                self.batch = robjects.r(_BATCH_R)
+                self._exact2x2 = exact2x2
+                info("Initialised R session with exact2x2")
+        return self
+
+    def warmup(self) -> "RSession":
+        """Run one small test of each kind so that R has loaded everything
+        the first real call would otherwise pay for."""
+        self.init()
+        self.uncondExact2x2(1, 5, 0, 6)
+        self.boschloo(1, 5, 0, 6)
+        return self
+
+    def health(self) -> Dict:
+        """Check that the session can evaluate R code.
+
+        Returns:
+            dict: with keys ``ok``, ``initialized``, ``r_version``,
+            ``exact2x2_version`` and ``error`` (None when healthy).
+        """
+        status = {
+            "ok": False,
+            "initialized": self.initialized,
+            "r_version": None,
+            "exact2x2_version": None,
+            "error": None,
+        }
+        try:
+            from rpy2 import robjects
+
+            self.init()
+            status["r_version"] = robjects.r("R.version.string")[0]
+            status["exact2x2_version"] = self.exact2x2_version()
+            status["ok"] = robjects.r("1L + 1L")[0] == 2
+            status["initialized"] = self.initialized
+        except Exception as e:
+            status["error"] = repr(e)
+        return status
+
+    def exact2x2_version(self) -> str:
+        from rpy2 import robjects
+
+        self.init()
+        return robjects.r('as.character(utils::packageVersion("exact2x2"))')[0]
+
+    def shutdown(self) -> None:
+        """Release the exact2x2 handles and let R collect garbage.
+
+        Embedded R itself cannot be restarted within a process, so R stays
+        loaded; a later ``init()`` simply resolves the handles again.
+        """
+        with self._lock:
+            if self._exact2x2 is None:
+                return
+            from rpy2 import robjects
+
+            self._exact2x2 = None
+            self.uncondExact2x2 = None
+            self.boschloo = None
+            self.batch = None
+            robjects.r("invisible(gc())")
+
+
+def to_r(values) -> tuple:
+    "Convert Python arguments to R objects with the active rpy2 conversion."
+    from rpy2.robjects import conversion
+
+    try:
+        py2rpy = conversion.get_conversion().py2rpy
+    except AttributeError:  # rpy2 < 3.5
+        py2rpy = conversion.py2rpy
+    return tuple(py2rpy(v) for v in values)
+
+
+_session = RSession()
+
+
+def get_session() -> RSession:
+    "Return the process wide R session."
+    return _session
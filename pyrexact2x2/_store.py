@@ -0,0 +1,246 @@
+"""Memory-mapped store of precomputed p-value matrices for fixed designs.
+
+A store is a directory with an ``index.json`` and one subdirectory per option
+set. Each option set holds the p-value matrices of all its designs (n1, n2)
+concatenated into a flat ``pvalues.npy`` and an ``offsets.npy`` giving the
+start of the matrix of each design (-1 where the design was not built).
+Lookups memory-map the files, so pages are loaded lazily and shared between
+processes, and no R session is needed.
+"""
+import json
+import os
+import shutil
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from ._batch import _broadcast, _check_counts, _uncond_options
+from ._canonical import Symmetry, uncond_symmetries
+
+_FORMAT = 1
+
+
+def _resolve_options(**options) -> Dict:
+    "uncondExact2x2 ordering options with defaults resolved, as plain scalars."
+    defaults = dict(
+        parmtype="difference",
+        nullparm=np.nan,
+        alternative="two.sided",
+        method="FisherAdj",
+        tsmethod="central",
+        midp=False,
+        gamma=0.0,
+        EplusM=False,
+        tiebreak=False,
+    )
+    unknown = set(options) - set(defaults)
+    if unknown:
+        raise TypeError("Unknown options %s" % sorted(unknown))
+    defaults.update({k: v for k, v in options.items() if v is not None})
+    cols = _uncond_options(_broadcast(**defaults))
+    return {k: v[0].item() for k, v in cols.items()}
+
+
+def _options_key(options: Dict) -> str:
+    return json.dumps(options, sort_keys=True)
+
+
+def _swapped_options(options: Dict) -> Optional[Dict]:
+    """The resolved options giving the same p-values with the groups
+    exchanged, None if the test is not symmetric under the exchange."""
+    allowed = uncond_symmetries(
+        options["parmtype"], options["method"], options["gamma"], options["tiebreak"]
+    )
+    if allowed is None or not allowed[0]:
+        return None
+    sym = Symmetry(True, False, options["parmtype"])
+    return dict(
+        options,
+        alternative=sym.alternative(options["alternative"]),
+        nullparm=sym.parameter(options["nullparm"]),
+    )
+
+
+class PvalueStore:
+    """Read access to a store built with ``build_store``.
+
+    Args:
+        path: Directory of the store.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        with open(os.path.join(path, "index.json")) as f:
+            self.index = json.load(f)
+        if self.index.get("format") != _FORMAT:
+            raise ValueError("Unsupported p-value store format in %s" % path)
+        self._sets = {_options_key(s["options"]): s for s in self.index["sets"]}
+        self._arrays = {}
+
+    def options(self) -> List[Dict]:
+        "The option sets in the store."
+        return [s["options"] for s in self.index["sets"]]
+
+    def _open(self, options: Dict):
+        "Arrays of a resolved option set, None if it is not in the store."
+        key = _options_key(options)
+        if key not in self._arrays:
+            if key not in self._sets:
+                return None
+            directory = os.path.join(self.path, self._sets[key]["directory"])
+            self._arrays[key] = (
+                np.load(os.path.join(directory, "offsets.npy"), mmap_mode="r"),
+                np.load(os.path.join(directory, "pvalues.npy"), mmap_mode="r"),
+            )
+        return self._arrays[key]
+
+    def _sources(self, **options):
+        """The arrays of the option set and, if the test is symmetric, of the
+        option set answering designs with the groups exchanged. Either is None
+        when not in the store, but not both."""
+        resolved = _resolve_options(**options)
+        swapped = _swapped_options(resolved)
+        arrays = self._open(resolved)
+        swapped_arrays = None if swapped is None else self._open(swapped)
+        if arrays is None and swapped_arrays is None:
+            raise KeyError(
+                "Options %s are not in the store %s" % (_options_key(resolved), self.path)
+            )
+        return arrays, swapped_arrays
+
+    @staticmethod
+    def _starts(offsets: np.ndarray, n1: np.ndarray, n2: np.ndarray) -> np.ndarray:
+        "Start of the matrix of each design, -1 where it is not in the store."
+        start = np.full(len(n1), -1, dtype=np.int64)
+        if offsets is not None:
+            inside = (n1 < offsets.shape[0]) & (n2 < offsets.shape[1])
+            start[inside] = offsets[n1[inside], n2[inside]]
+        return start
+
+    def matrix(self, n1: int, n2: int, **options) -> np.ndarray:
+        """The (n1+1) x (n2+1) p-value matrix of a design as a read-only view.
+
+        A design stored only with the groups exchanged is returned transposed.
+        """
+        for source, transpose in zip(self._sources(**options), (False, True)):
+            if source is None:
+                continue
+            offsets, pvalues = source
+            a, b = (n2, n1) if transpose else (n1, n2)
+            if a < offsets.shape[0] and b < offsets.shape[1]:
+                start = offsets[a, b]
+                if start >= 0:
+                    m = pvalues[start:start + (a + 1) * (b + 1)].reshape(a + 1, b + 1)
+                    return m.T if transpose else m
+        raise KeyError("Design n1=%d, n2=%d is not in the store" % (n1, n2))
+
+    def lookup(self, x1, n1, x2, n2, **options) -> np.ndarray:
+        """P-values of tables, scalars or arrays, under one option set.
+
+        Options are given as in ``uncondExact2x2`` and must match an option set
+        of the store after defaults are resolved. Tables of designs missing
+        from the store are answered from the design with the groups
+        exchanged when the test is symmetric under the exchange.
+        """
+        arrays, swapped = self._sources(**options)
+        offsets, pvalues = arrays or (None, None)
+        cols = _broadcast(x1=x1, n1=n1, x2=x2, n2=n2)
+        _check_counts(cols)
+        x1, n1, x2, n2 = cols["x1"], cols["n1"], cols["x2"], cols["n2"]
+        out = np.empty(len(x1), dtype=float)
+        start = self._starts(offsets, n1, n2)
+        found = start >= 0
+        if found.any():
+            out[found] = pvalues[start[found] + x1[found] * (n2[found] + 1) + x2[found]]
+        if not np.all(found) and swapped is not None:
+            rest = np.flatnonzero(~found)
+            swapped_offsets, swapped_pvalues = swapped
+            start = self._starts(swapped_offsets, n2[rest], n1[rest])
+            ok = start >= 0
+            rest, start = rest[ok], start[ok]
+            out[rest] = swapped_pvalues[start + x2[rest] * (n1[rest] + 1) + x1[rest]]
+            found[rest] = True
+        if not np.all(found):
+            i = np.flatnonzero(~found)[0]
+            raise KeyError("Design n1=%d, n2=%d is not in the store" % (n1[i], n2[i]))
+        return out
+
+
+def _designs(n1: Iterable[int], n2: Iterable[int], canonical: bool) -> List[Tuple[int, int]]:
+    "Designs built by ``build_store``, only those with n1 <= n2 if canonical."
+    designs = {(int(a), int(b)) for a in n1 for b in n2}
+    if canonical:
+        designs = {(min(a, b), max(a, b)) for a, b in designs}
+    return sorted(designs)
+
+
+def build_store(
+    path: str, n1: Iterable[int], n2: Iterable[int], canonical: bool = False, **options
+) -> PvalueStore:
+    """Precompute the p-value matrices of all designs n1 x n2 for one option set.
+
+    Adds the option set to the store at ``path``, creating the store if
+    needed and replacing an earlier build of the same options. Requires R.
+
+    Args:
+        path: Directory of the store.
+        n1, n2: Sample sizes of the two groups, e.g. ``range(1, 101)``.
+        canonical: Store each design only with n1 <= n2. Lookups of the
+            other designs are answered with the groups exchanged, which
+            requires options under which the test is symmetric, e.g. a
+            two-sided test of no difference.
+        **options: Test options as in ``uncondExact2x2``.
+
+    Returns:
+        PvalueStore: The updated store.
+    """
+    from ._pvals import _pvals_matrix
+
+    options = _resolve_options(**options)
+    n1 = sorted(set(int(n) for n in n1))
+    n2 = sorted(set(int(n) for n in n2))
+    if canonical and _swapped_options(options) != options:
+        raise ValueError("The test is not symmetric in the groups under options %s" % options)
+    designs = _designs(n1, n2, canonical)
+    os.makedirs(path, exist_ok=True)
+    index_path = os.path.join(path, "index.json")
+    if os.path.exists(index_path):
+        with open(index_path) as f:
+            index = json.load(f)
+    else:
+        index = {"format": _FORMAT, "sets": []}
+    key = _options_key(options)
+    replaced = [s for s in index["sets"] if _options_key(s["options"]) == key]
+    sets = [s for s in index["sets"] if _options_key(s["options"]) != key]
+    # Never write into a directory that readers may still have mapped.
+    used = {s["directory"] for s in index["sets"]}
+    directory = next("set%d" % i for i in range(len(used) + 1) if "set%d" % i not in used)
+    os.makedirs(os.path.join(path, directory), exist_ok=True)
+
+    shape = (max(a for a, _ in designs) + 1, max(b for _, b in designs) + 1)
+    offsets = np.full(shape, -1, dtype=np.int64)
+    total = 0
+    for a, b in designs:
+        offsets[a, b] = total
+        total += (a + 1) * (b + 1)
+    pvalues = np.lib.format.open_memmap(
+        os.path.join(path, directory, "pvalues.npy"), mode="w+", dtype=np.float64, shape=(total,)
+    )
+    for a, b in designs:
+        start = offsets[a, b]
+        pvalues[start:start + (a + 1) * (b + 1)] = np.ravel(_pvals_matrix(a, b, options))
+    pvalues.flush()
+    del pvalues
+    np.save(os.path.join(path, directory, "offsets.npy"), offsets)
+
+    sets.append(
+        {"directory": directory, "options": options, "n1": n1, "n2": n2, "canonical": canonical}
+    )
+    index["sets"] = sets
+    tmp_path = index_path + ".tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(index, f, indent=1)
+    os.replace(tmp_path, index_path)
+    for s in replaced:
+        shutil.rmtree(os.path.join(path, s["directory"]), ignore_errors=True)
+    return PvalueStore(path)
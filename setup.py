@@ -2,6 +2,7 @@ from setuptools import setup
 import versioneer
 
 requirements = [
+    "numpy",
     "pandas",
     "rpy2",
     # package requirements go here
@@ -19,6 +20,11 @@ setup(
     packages=['pyrexact2x2'],
     
     install_requires=requirements,
+    entry_points={
+        'console_scripts': [
+            'pyrexact2x2 = pyrexact2x2.__main__:main',
+        ],
+    },
     keywords='pyrexact2x2',
     classifiers=[
         'Programming Language :: Python :: 3.5',
@@ -0,0 +1,50 @@
+import asyncio
+
+import pytest
+
+import pyrexact2x2
+
+
+def test_async_pool_numpy():
+    async def run(pool):
+        tables = [(1, 5, 0, 6), (3, 10, 8, 12), (7, 9, 1, 9)]
+        singles = await asyncio.gather(
+            *[pool.boschloo(*t, engine="numpy") for t in tables]
+        )
+        return tables, singles
+
+    async def main():
+        async with pyrexact2x2.AsyncPool(workers=2, max_pending=1, warmup=False) as pool:
+            return await run(pool)
+
+    tables, singles = asyncio.run(main())
+    for table, res in zip(tables, singles):
+        expected = pyrexact2x2.boschloo(*table, engine="numpy")
+        assert res.p_value == pytest.approx(expected.p_value)
+
+
+def test_default_pool_numpy():
+    pyrexact2x2.set_async_pool(None)
+    try:
+        assert not pyrexact2x2.get_async_pool()._executor._initializer
+        ret = asyncio.run(pyrexact2x2.boschloo_async(1, 5, 0, 6, engine="numpy"))
+    finally:
+        pool = pyrexact2x2.get_async_pool()
+        pyrexact2x2.set_async_pool(None)
+        pool.close()
+    assert ret.p_value == pytest.approx(pyrexact2x2.boschloo(1, 5, 0, 6, engine="numpy").p_value)
+
+
+def test_async_many():
+    x1, n1, x2, n2 = [1, 3, 0, 7, 2], [5, 8, 6, 9, 4], [0, 4, 2, 1, 4], [6, 8, 4, 9, 4]
+    expected = pyrexact2x2.boschloo_many(x1, n1, x2, n2)
+    pool = pyrexact2x2.AsyncPool(workers=2, chunksize=2)
+    pyrexact2x2.set_async_pool(pool)
+    try:
+        single = asyncio.run(pyrexact2x2.boschloo_async(1, 5, 0, 6))
+        ret = asyncio.run(pyrexact2x2.boschloo_many_async(x1, n1, x2, n2))
+    finally:
+        pyrexact2x2.set_async_pool(None)
+        pool.close()
+    assert single.p_value == pytest.approx(expected.p_value[0])
+    assert ret.p_value.tolist() == pytest.approx(expected.p_value.tolist())
@@ -0,0 +1,116 @@
+import numpy as np
+import pytest
+
+import pyrexact2x2
+from pyrexact2x2 import _cache
+from pyrexact2x2._cache import DiskCache, LRUCache
+
+
+def test_lru_eviction():
+    cache = LRUCache(maxsize=2)
+    cache.put("a", {"p.value": 0.1})
+    cache.put("b", {"p.value": 0.2})
+    assert cache.get("a") == {"p.value": 0.1}
+    cache.put("c", {"p.value": 0.3})
+    assert cache.get("b") is None
+    assert cache.get("c") == {"p.value": 0.3}
+    info = cache.info()
+    assert (info.hits, info.misses, info.evictions, info.currsize) == (2, 1, 1, 2)
+    cache.clear()
+    assert cache.info().currsize == 0 and cache.info().hits == 0
+
+
+def test_enable_cache():
+    assert pyrexact2x2.cache_info() is None
+    pyrexact2x2.enable_cache(maxsize=10)
+    try:
+        first = pyrexact2x2.boschloo(1, 5, 0, 6)
+        first["p.value"] = -1.0
+        second = pyrexact2x2.boschloo(1, 5, 0, 6)
+        assert second["p.value"] > 0
+        pyrexact2x2.boschloo(1, 5, 0, 6, midp=True)
+        info = pyrexact2x2.cache_info()
+        assert (info.hits, info.misses) == (1, 2)
+        pyrexact2x2.cache_clear()
+        assert pyrexact2x2.cache_info().currsize == 0
+    finally:
+        pyrexact2x2.disable_cache()
+
+
+def test_disk_cache(tmp_path):
+    path = str(tmp_path / "cache.sqlite")
+    cache = DiskCache(path, version="v1")
+    key = ["boschloo", 1, 5, 0, 6, "two.sided", 1.0, False, 0.95, False, "central"]
+    cache.put(key, {"p.value": 0.25, "method": "Boschloo"})
+    assert cache.get(key) == {"p.value": 0.25, "method": "Boschloo"}
+
+    assert DiskCache(path, version="v1").get(key) == {"p.value": 0.25, "method": "Boschloo"}
+    assert DiskCache(path, version="v2").get(key) is None
+    assert DiskCache(path, version="v1").info().currsize == 0
+
+
+def test_disk_cache_numpy_keys(tmp_path):
+    disk = DiskCache(str(tmp_path / "cache.sqlite"), version="v1")
+    disk.put(("boschloo", np.int64(1), 5.0, np.float64(0.95)), {"p.value": 0.5})
+    assert disk.get(("boschloo", 1, 5, 0.95)) == {"p.value": 0.5}
+    pyrexact2x2.enable_cache(maxsize=10, disk=disk)
+    try:
+        ret = pyrexact2x2.boschloo(np.int64(1), 5, 0, 6, engine="numpy")
+        pyrexact2x2.enable_cache(maxsize=10, disk=disk)
+        assert pyrexact2x2.boschloo(1, 5, 0, 6, engine="numpy").p_value == ret.p_value
+        assert disk.info().hits == 2
+    finally:
+        pyrexact2x2.disable_cache()
+
+
+def test_disk_cache_behind_memory(tmp_path):
+    path = str(tmp_path / "cache.sqlite")
+    disk = DiskCache(path, version="v1")
+    disk.put(("boschloo", 1), {"p.value": 0.5})
+    pyrexact2x2.enable_cache(maxsize=10, disk=disk)
+    try:
+        assert _cache.lookup(("boschloo", 1)) == {"p.value": 0.5}
+        assert _cache.lookup(("boschloo", 1)) == {"p.value": 0.5}
+        assert pyrexact2x2.disk_cache_info().hits == 1
+        _cache.store(("boschloo", 2), {"p.value": 0.1})
+        assert DiskCache(path, version="v1").get(("boschloo", 2)) == {"p.value": 0.1}
+    finally:
+        pyrexact2x2.disable_cache()
+
+
+def test_canonical_cache():
+    tables = [(9, 10, 2, 12), (2, 12, 9, 10), (1, 10, 10, 12), (10, 12, 1, 10)]
+    direct = [pyrexact2x2.boschloo(*t, conf_int=True, engine="numpy") for t in tables]
+    pyrexact2x2.enable_cache(canonical=True)
+    try:
+        cached = [pyrexact2x2.boschloo(*t, conf_int=True, engine="numpy") for t in tables]
+        info = pyrexact2x2.cache_info()
+        assert (info.hits, info.misses) == (3, 1)
+        diff = pyrexact2x2.uncondExact2x2(2, 12, 9, 10, alternative="less", engine="numpy")
+        same = pyrexact2x2.uncondExact2x2(9, 10, 2, 12, alternative="greater", engine="numpy")
+        assert pyrexact2x2.cache_info().hits == 4
+    finally:
+        pyrexact2x2.disable_cache()
+    for d, c in zip(direct, cached):
+        assert c.p_value == pytest.approx(d.p_value, abs=1e-6)
+        assert c["conf.int"] == pytest.approx(d["conf.int"], rel=1e-6)
+        assert (c.estimate, c.statistic, c.alternative, c.data_name) == (
+            d.estimate,
+            d.statistic,
+            d.alternative,
+            d.data_name,
+        )
+    assert diff.estimate == pytest.approx(-same.estimate)
+    assert diff.p_value == pytest.approx(same.p_value, abs=1e-6)
+
+
+def test_uncond_symmetries():
+    from pyrexact2x2._canonical import uncond_symmetries
+
+    assert uncond_symmetries("difference", "score", 0.0, False) == (True, True)
+    assert uncond_symmetries("oddsratio", "score", 0.0, False) == (True, True)
+    assert uncond_symmetries("ratio", "score", 0.0, False) == (True, False)
+    # Abbreviations matched partially by R are not mapped.
+    for parmtype in ("diff", "odds", "rat"):
+        assert uncond_symmetries(parmtype, "score", 0.0, False) is None
+    assert uncond_symmetries("difference", "user", 0.0, False) is None
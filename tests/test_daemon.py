@@ -0,0 +1,122 @@
+import os
+import signal
+import threading
+
+import pytest
+
+from pyrexact2x2 import _daemon, get_session
+
+
+def test_daemon(monkeypatch, tmp_path):
+    monkeypatch.setattr(_daemon, "_client", None)
+    monkeypatch.setattr(_daemon, "_next_check", 0.0)
+    path = str(tmp_path / "d.sock")
+    monkeypatch.setenv("PYREXACT2X2_DAEMON", path)
+    assert _daemon.client() is None
+    assert _daemon.forward("boschloo", 1, 5, 0, 6) is None
+
+    with pytest.raises(OSError):
+        _daemon.connect_daemon(path)
+    daemon = _daemon.Daemon(path, workers=1, warmup=False)
+    thread = threading.Thread(target=daemon.serve_forever)
+    thread.start()
+    try:
+        with pytest.raises(OSError):
+            _daemon.Daemon(path)
+        client = _daemon.connect_daemon()
+        assert _daemon.client() is client
+        info = client.call("ping")
+        assert info["workers"] == 1
+        assert (info["protocol"], info["version"]) == _daemon._version()
+        with pytest.raises(RuntimeError, match="Unknown call"):
+            _daemon.forward("nonsense")
+        client.close()
+    finally:
+        daemon.shutdown()
+        daemon.close()
+        thread.join()
+
+    # A daemon that went away is dropped and calls compute in process.
+    assert _daemon.forward("ping") is None
+    assert _daemon.client() is None
+
+
+def test_daemon_failure(monkeypatch, tmp_path):
+    monkeypatch.setattr(_daemon, "_client", None)
+    monkeypatch.setattr(_daemon, "_next_check", 0.0)
+    path = str(tmp_path / "d.sock")
+    monkeypatch.setenv("PYREXACT2X2_DAEMON", path)
+    assert _daemon.client() is None
+
+    daemon = _daemon.Daemon(path, workers=1, warmup=False)
+    thread = threading.Thread(target=daemon.serve_forever)
+    thread.start()
+    try:
+        # The socket is looked up again only after the interval.
+        assert _daemon.client() is None
+        monkeypatch.setattr(_daemon, "RECHECK_INTERVAL", 0.0)
+        monkeypatch.setattr(_daemon, "_next_check", 0.0)
+        assert _daemon.client() is not None
+
+        with pytest.raises(RuntimeError, match="Unknown call"):
+            _daemon.forward("nonsense")
+        for pid in list(daemon.executor._processes):
+            os.kill(pid, signal.SIGKILL)
+        # A dead worker is a failure of the daemon: the call computes in
+        # process and the daemon replaces its workers.
+        assert _daemon.forward("nonsense") is None
+        with pytest.raises(RuntimeError, match="Unknown call"):
+            _daemon.forward("nonsense")
+        if not get_session().health()["ok"]:
+            # Neither is R missing in the workers.
+            assert _daemon.forward("boschloo", 1, 5, 0, 6) is None
+        _daemon.client().close()
+    finally:
+        daemon.shutdown()
+        daemon.close()
+        thread.join()
+
+
+def test_daemon_refused(monkeypatch, tmp_path):
+    monkeypatch.setattr(_daemon, "_client", None)
+    monkeypatch.setattr(_daemon, "_next_check", 0.0)
+    path = str(tmp_path / "d.sock")
+    monkeypatch.setenv("PYREXACT2X2_DAEMON", path)
+
+    # Something other than a socket at the path is neither used nor replaced.
+    with open(path, "w"):
+        pass
+    assert _daemon.client() is None
+    with pytest.raises(PermissionError):
+        _daemon.connect_daemon(path)
+    with pytest.raises(PermissionError):
+        _daemon.Daemon(path)
+    os.unlink(path)
+
+    daemon = _daemon.Daemon(path, workers=1, warmup=False)
+    daemon.version = (_daemon.PROTOCOL + 1, daemon.version[1])
+    thread = threading.Thread(target=daemon.serve_forever)
+    thread.start()
+    try:
+        with pytest.raises(RuntimeError, match="protocol"):
+            _daemon.connect_daemon(path)
+        monkeypatch.setattr(_daemon, "_next_check", 0.0)
+        assert _daemon.client() is None
+    finally:
+        daemon.shutdown()
+        daemon.close()
+        thread.join()
+
+
+def test_private_directory(monkeypatch, tmp_path):
+    monkeypatch.delenv("PYREXACT2X2_DAEMON", raising=False)
+    monkeypatch.delenv("XDG_RUNTIME_DIR", raising=False)
+    monkeypatch.setattr(_daemon.tempfile, "gettempdir", lambda: str(tmp_path))
+    path = _daemon.socket_path()
+    assert os.path.dirname(path) == _daemon._private_directory()
+
+    with _daemon.Daemon(warmup=False):
+        assert os.stat(os.path.dirname(path)).st_mode & 0o777 == 0o700
+    os.chmod(os.path.dirname(path), 0o755)
+    with pytest.raises(PermissionError):
+        _daemon.Daemon(warmup=False)
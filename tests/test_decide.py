@@ -0,0 +1,42 @@
+import numpy as np
+import pytest
+from hypothesis import given, settings, strategies as st
+
+import pyrexact2x2
+from .test_pyrexact2x2 import sub_pairs
+
+
+@settings(max_examples=50, deadline=None)
+@given(
+    xn1=sub_pairs(30, min_values=1),
+    xn2=sub_pairs(30, min_values=1),
+    alternative=st.sampled_from(["two.sided", "less", "greater"]),
+    tsmethod=st.sampled_from(["central", "minlike"]),
+    alpha=st.sampled_from([0.01, 0.05, 0.2]),
+)
+def test_decide_matches_pvalue(xn1, xn2, alternative, tsmethod, alpha):
+    x1, n1 = xn1
+    x2, n2 = xn2
+    kwargs = dict(alternative=alternative, tsmethod=tsmethod)
+    p = pyrexact2x2.boschloo(x1, n1, x2, n2, engine="numpy", **kwargs).p_value
+    assert pyrexact2x2.decide(x1, n1, x2, n2, alpha=alpha, **kwargs) == (p < alpha)
+    lower, upper = pyrexact2x2.pvalue_bounds(x1, n1, x2, n2, **kwargs)
+    assert lower <= p + 1e-9
+    assert p <= upper + 1e-6
+
+    kwargs = dict(alternative=alternative, method="score")
+    p = pyrexact2x2.uncondExact2x2(x1, n1, x2, n2, engine="numpy", **kwargs).p_value
+    kwargs["test"] = "uncondExact2x2"
+    assert pyrexact2x2.decide(x1, n1, x2, n2, alpha=alpha, **kwargs) == (p < alpha)
+
+
+def test_decide_many():
+    x1, n1, x2, n2 = np.array([0, 5, 3]), 10, np.array([8, 5, 4]), 10
+    ret = pyrexact2x2.decide_many(x1, n1, x2, n2, alpha=[0.05, 0.05, 0.5])
+    expected = [
+        pyrexact2x2.boschloo(a, n1, b, n2, engine="numpy").p_value < alpha
+        for a, b, alpha in zip(x1, x2, [0.05, 0.05, 0.5])
+    ]
+    assert ret.tolist() == expected
+    with pytest.raises(ValueError):
+        pyrexact2x2.decide(1, 5, 0, 6, test="fisher")
@@ -0,0 +1,40 @@
+import json
+import subprocess
+import sys
+
+# Generous enough for slow CI machines; importing pandas alone takes longer.
+IMPORT_BUDGET_SECONDS = 0.2
+
+_PROBE = """
+import json, sys, time
+start = time.perf_counter()
+import pyrexact2x2
+elapsed = time.perf_counter() - start
+print(json.dumps({"elapsed": elapsed, "modules": sorted(sys.modules)}))
+"""
+
+
+def _probe():
+    out = subprocess.run(
+        [sys.executable, "-c", _PROBE], check=True, capture_output=True, text=True
+    ).stdout
+    return json.loads(out)
+
+
+def test_import_is_lazy():
+    modules = set(_probe()["modules"])
+    for heavy in ("numpy", "pandas", "rpy2", "pyrexact2x2._numpy_engine"):
+        assert heavy not in modules, heavy
+
+
+def test_import_time():
+    elapsed = min(_probe()["elapsed"] for _ in range(3))
+    assert elapsed < IMPORT_BUDGET_SECONDS, elapsed
+
+
+def test_lazy_attributes():
+    import pyrexact2x2
+
+    assert callable(pyrexact2x2.uncondExact2x2_many)
+    assert "Pool" in dir(pyrexact2x2)
+    assert isinstance(pyrexact2x2.__version__, str)
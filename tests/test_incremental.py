@@ -0,0 +1,49 @@
+import numpy as np
+import pytest
+
+import pyrexact2x2
+from pyrexact2x2 import _numpy_engine
+from pyrexact2x2._incremental import _grow_pmf
+
+
+def test_grow_pmf():
+    theta = np.linspace(0, 1, 7)
+    grown = _grow_pmf(_numpy_engine._binom_pmf(5, theta), theta, 3)
+    np.testing.assert_allclose(grown, _numpy_engine._binom_pmf(8, theta), atol=1e-15)
+
+
+@pytest.mark.parametrize(
+    "test, options",
+    [
+        ("boschloo", {"conf_int": True}),
+        ("boschloo", {"conf_int": True, "tsmethod": "minlike", "midp": True}),
+        ("uncondExact2x2", {"method": "score", "parmtype": "ratio"}),
+        ("uncondExact2x2", {"alternative": "less"}),
+    ],
+)
+def test_incremental_tester(test, options):
+    tester = pyrexact2x2.IncrementalTester(test, **options)
+    direct = getattr(pyrexact2x2, test)
+    counts = [(1, 5, 0, 6), (3, 9, 1, 8), (3, 9, 1, 8), (6, 14, 2, 16), (8, 40, 12, 40), (2, 7, 4, 9)]
+    for x1, n1, x2, n2 in counts:
+        ret = tester.update(x1, n1, x2, n2)
+        expected = direct(x1, n1, x2, n2, engine="numpy", **options)
+        assert ret.p_value == pytest.approx(expected.p_value, abs=1e-10)
+        assert ret.estimate == expected.estimate
+        assert ret.data_name == expected.data_name and ret.method == expected.method
+        for got, want in zip(ret["conf.int"], expected["conf.int"]):
+            assert got == pytest.approx(want, rel=1e-5, nan_ok=True)
+    assert tester.nbytes > 0
+
+
+def test_incremental_memory_bound():
+    tester = pyrexact2x2.IncrementalTester("boschloo", max_bytes=0)
+    tester.update(3, 10, 4, 10)
+    assert tester._design is None
+    assert tester.nbytes == tester._B1.nbytes + tester._B2.nbytes
+    ret = tester.update(4, 12, 4, 11)
+    assert ret.p_value == pytest.approx(pyrexact2x2.boschloo(4, 12, 4, 11, engine="numpy").p_value)
+    with pytest.raises(ValueError):
+        pyrexact2x2.IncrementalTester("uncondExact2x2", gamma=0.01)
+    with pytest.raises(ValueError):
+        pyrexact2x2.IncrementalTester("uncondExact2x2", conf_int=True)
@@ -0,0 +1,32 @@
+import json
+
+import pyrexact2x2
+
+
+def test_instrument_numpy_engine():
+    with pyrexact2x2.instrument() as timings:
+        for x2 in range(3):
+            pyrexact2x2.boschloo(1, 5, x2, 6, engine="numpy")
+        pyrexact2x2.uncondExact2x2(1, 5, 0, 6, method="score", engine="numpy")
+    pyrexact2x2.boschloo(1, 5, 0, 6, engine="numpy")
+
+    summary = timings.summary()
+    assert summary["boschloo/central/numpy"]["calls"] == 3
+    assert summary["boschloo/central/numpy"]["compute"]["count"] == 3
+    assert summary["uncondExact2x2/score/numpy"]["compute"]["total"] > 0
+    counts, edges = timings.histogram("boschloo", "compute", bins=4)
+    assert counts.sum() == 3 and len(edges) == 5
+    data = json.loads(timings.to_json(raw=True))
+    assert data["summary"] == json.loads(json.dumps(summary))
+    assert len(data["timings"]) == 4
+
+
+def test_instrument_r_phases():
+    timings = pyrexact2x2.enable_instrumentation()
+    try:
+        pyrexact2x2.uncondExact2x2(1, 5, 0, 6)
+    finally:
+        pyrexact2x2.disable_instrumentation()
+    phases = timings.summary()["uncondExact2x2/FisherAdj/R"]
+    for name in ("cache_lookup", "import", "convert_in", "compute", "convert_out"):
+        assert phases[name]["count"] == 1
@@ -0,0 +1,44 @@
+import io
+
+import numpy as np
+
+from pyrexact2x2 import _batch
+from pyrexact2x2.__main__ import main
+from pyrexact2x2._result import BatchResult
+
+
+def fake_many(x1, n1, x2, n2, **options):
+    x1, n1, x2, n2 = [np.asarray(v, dtype=float) for v in (x1, n1, x2, n2)]
+    return BatchResult([x1 / n1, x2 / n2, np.full(len(x1), np.nan), n1 + n2 + options["OR"]])
+
+
+def test_stream_tables(monkeypatch, capsys, tmp_path):
+    monkeypatch.setattr(_batch, "boschloo_many", fake_many)
+    monkeypatch.setattr("sys.stdin", io.StringIO("id\tx1\tn1\tx2\tn2\nA\t1\t4\t0\t6\nB\t3\t10\t8\t8\nC\t0\t1\t0\t1\n"))
+    assert main(["test", "--test", "boschloo", "--chunksize", "2", "--OR", "0.5"]) == 0
+    lines = capsys.readouterr().out.splitlines()
+    assert lines[0].split("\t") == ["id", "x1", "n1", "x2", "n2", "p.value", "conf.int.low", "conf.int.high", "estimate"]
+    assert lines[1:] == [
+        "A\t1\t4\t0\t6\t0.25\t0.0\tNA\t10.5",
+        "B\t3\t10\t8\t8\t0.3\t1.0\tNA\t18.5",
+        "C\t0\t1\t0\t1\t0.0\t0.0\tNA\t2.5",
+    ]
+
+    path = tmp_path / "tables.csv"
+    path.write_text("a,b,c,d\n1,3,0,6\n")
+    assert main(["test", str(path), "--test", "boschloo", "--cells", "a,b,c,d"]) == 0
+    assert capsys.readouterr().out.splitlines()[1] == "1,3,0,6,0.25,0.0,NA,11.0"
+
+    assert main(["test", str(path), "--columns", "x1,n1,x2,n2"]) == 2
+
+
+def test_stream_blank_and_bad_rows(monkeypatch, capsys, tmp_path):
+    monkeypatch.setattr(_batch, "boschloo_many", fake_many)
+    path = tmp_path / "tables.csv"
+    path.write_text("x1,n1,x2,n2\n1,4,0,6\n\n3,10,8,8\n\n")
+    assert main(["test", str(path), "--test", "boschloo"]) == 0
+    assert len(capsys.readouterr().out.splitlines()) == 3
+
+    path.write_text("x1,n1,x2,n2\n1,4,0,6\n3,10\n")
+    assert main(["test", str(path), "--test", "boschloo"]) == 2
+    assert "Line 3" in capsys.readouterr().err
@@ -0,0 +1,55 @@
+import numpy as np
+import pytest
+
+import pyrexact2x2
+from pyrexact2x2._multiple import reject
+
+
+def test_reject():
+    p = np.array([0.01, 0.04, 0.03, 0.005, 0.5, np.nan])
+    assert reject(p, 0.05, "bonferroni").tolist() == [False, False, False, True, False, False]
+    assert reject(p, 0.05, "holm").tolist() == [True, False, False, True, False, False]
+    assert reject(p, 0.04, "holm").tolist() == [False, False, False, True, False, False]
+    assert reject(p, 0.1, "holm").tolist() == [True, False, False, True, False, False]
+    assert reject(p, 0.05, "BH").tolist() == [True, False, False, True, False, False]
+    assert reject(p, 0.1, "BH").tolist() == [True, True, True, True, False, False]
+    assert not reject(p, 0.05, "BY").any()
+    assert reject(p, 0.2, "BY").tolist() == [True, True, True, True, False, False]
+    assert reject(np.array([]), 0.05).tolist() == []
+    with pytest.raises(ValueError):
+        reject(p, 0.05, "hochberg")
+
+
+@pytest.mark.parametrize("method", ["bonferroni", "holm", "BH", "BY"])
+def test_multiple_tests(method):
+    rng = np.random.default_rng(1)
+    n1, n2 = 12, 15
+    x1 = rng.integers(0, n1 + 1, 60)
+    x2 = rng.integers(0, n2 + 1, 60)
+    res = pyrexact2x2.multiple_tests(x1, n1, x2, n2, alpha=0.1, method=method)
+    p = np.array(
+        [pyrexact2x2.boschloo(a, n1, b, n2, engine="numpy").p_value for a, b in zip(x1, x2)]
+    )
+    assert res.reject.tolist() == reject(p, 0.1, method).tolist()
+    assert res.evaluated < len(x1)
+    done = ~np.isnan(res.p_value)
+    np.testing.assert_allclose(res.p_value[done], p[done])
+    assert np.all(res.lower <= p + 1e-9) and np.all(p <= res.upper + 1e-6)
+
+
+def test_multiple_tests_R():
+    rng = np.random.default_rng(2)
+    x1 = rng.integers(0, 9, 12)
+    x2 = rng.integers(0, 11, 12)
+    res = pyrexact2x2.multiple_tests(x1, 8, x2, 10, alpha=0.1, engine="R")
+    p = pyrexact2x2.boschloo_many(x1, 8, x2, 10).p_value
+    assert res.reject.tolist() == reject(p, 0.1, "BH").tolist()
+    assert np.all((res.lower == 0.0) | ~np.isnan(res.p_value))
+
+    control = {"nPgrid": 20}
+    res = pyrexact2x2.multiple_tests(x1[:3], 8, x2[:3], 10, engine="R", control=control)
+    done = ~np.isnan(res.p_value)
+    expected = [
+        pyrexact2x2.boschloo(a, 8, b, 10, control=control).p_value for a, b in zip(x1[:3], x2[:3])
+    ]
+    np.testing.assert_allclose(res.p_value[done], np.array(expected)[done])
@@ -0,0 +1,180 @@
+import pytest
+from hypothesis import given, settings, strategies as st
+from scipy.stats import boschloo_exact
+
+import pyrexact2x2
+from .test_pyrexact2x2 import MAX_OBSERVED_N, sub_pairs
+
+# exact2x2 compares group 2 to group 1, scipy the first column to the second.
+SCIPY_ALTERNATIVE = {"two.sided": "two-sided", "less": "greater", "greater": "less"}
+
+
+@settings(max_examples=50, deadline=None)
+@given(
+    xn1=sub_pairs(40, min_values=1),
+    xn2=sub_pairs(40, min_values=1),
+    alternative=st.sampled_from(["two.sided", "less", "greater"]),
+)
+def test_boschloo_matches_scipy(xn1, xn2, alternative):
+    x1, n1 = xn1
+    x2, n2 = xn2
+    ret = pyrexact2x2.boschloo(x1, n1, x2, n2, alternative=alternative, engine="numpy")
+    expected = boschloo_exact(
+        [[x1, x2], [n1 - x1, n2 - x2]], alternative=SCIPY_ALTERNATIVE[alternative], n=64
+    )
+    if expected.pvalue < 0.999:
+        assert ret["p.value"] == pytest.approx(expected.pvalue, abs=1e-6)
+    else:
+        # scipy's grid leaves out the ends of the nuisance parameter, where
+        # p-values close to 1 reach their supremum.
+        assert ret["p.value"] >= expected.pvalue - 1e-6
+
+
+@settings(max_examples=20, deadline=None)
+@given(
+    xn1=sub_pairs(30),
+    xn2=sub_pairs(30),
+    alternative=st.sampled_from(["two.sided", "less", "greater"]),
+    tsmethod=st.sampled_from(["central", "minlike"]),
+    midp=st.booleans(),
+    OR=st.sampled_from([1.0, 0.5, 3.0]),
+)
+def test_boschloo_matches_r(xn1, xn2, alternative, tsmethod, midp, OR):
+    x1, n1 = xn1
+    x2, n2 = xn2
+    kwargs = dict(alternative=alternative, tsmethod=tsmethod, midp=midp, OR=OR)
+    ret = pyrexact2x2.boschloo(x1, n1, x2, n2, engine="numpy", **kwargs)
+    expected = pyrexact2x2.boschloo(x1, n1, x2, n2, **kwargs)
+    assert ret["p.value"] == pytest.approx(expected["p.value"], rel=1e-4, abs=1e-6)
+
+
+@pytest.mark.parametrize("table", [(3, 10, 8, 12), (12, 40, 25, 40), (0, 10, 5, 10)])
+def test_boschloo_ci(table):
+    ret = pyrexact2x2.boschloo(*table, conf_int=True, engine="numpy")
+    low, high = ret["conf.int"]
+    assert low < ret.estimate <= high
+    # The limits are where the one-sided p-values reach alpha / 2.
+    assert pyrexact2x2.boschloo(
+        *table, alternative="greater", OR=low, engine="numpy"
+    ).p_value == pytest.approx(0.025, abs=1e-6)
+    if high < float("inf"):
+        assert pyrexact2x2.boschloo(
+            *table, alternative="less", OR=high, engine="numpy"
+        ).p_value == pytest.approx(0.025, abs=1e-6)
+    one_sided = pyrexact2x2.boschloo(*table, alternative="greater", conf_int=True, engine="numpy")
+    assert low < one_sided.ci_low and one_sided.ci_high == float("inf")
+
+
+@pytest.mark.parametrize("tsmethod", ["central", "minlike"])
+def test_boschloo_ci_matches_r(tsmethod):
+    kwargs = dict(conf_int=True, tsmethod=tsmethod)
+    ret = pyrexact2x2.boschloo(3, 10, 8, 12, engine="numpy", **kwargs)
+    expected = pyrexact2x2.boschloo(3, 10, 8, 12, **kwargs)
+    assert ret["conf.int"] == pytest.approx(expected["conf.int"], rel=1e-3)
+
+
+def test_boschloo_minlike_fisher():
+    from scipy.stats import fisher_exact
+
+    ret = pyrexact2x2.boschloo(1, 5, 0, 6, tsmethod="minlike", engine="numpy")
+    assert 0 < ret["p.value"] <= fisher_exact([[1, 4], [0, 6]])[1]
+    with pytest.raises(ValueError):
+        pyrexact2x2.boschloo(1, 5, 0, 6, engine="fortran")
+
+
+@settings(max_examples=50, deadline=None)
+@given(
+    xn1=sub_pairs(30, min_values=1),
+    xn2=sub_pairs(30, min_values=1),
+    alternative=st.sampled_from(["two.sided", "less", "greater"]),
+    pooled=st.booleans(),
+)
+def test_wald_matches_scipy_barnard(xn1, xn2, alternative, pooled):
+    from scipy.stats import barnard_exact
+
+    x1, n1 = xn1
+    x2, n2 = xn2
+    ret = pyrexact2x2.uncondExact2x2(
+        x1,
+        n1,
+        x2,
+        n2,
+        method="wald-pooled" if pooled else "wald-unpooled",
+        alternative=alternative,
+        tsmethod="square",
+        engine="numpy",
+    )
+    expected = barnard_exact(
+        [[x1, x2], [n1 - x1, n2 - x2]],
+        alternative=SCIPY_ALTERNATIVE[alternative],
+        pooled=pooled,
+        n=64,
+    )
+    # scipy compares the statistic without a tolerance for ties, so it may
+    # leave out tables tying with the observed one.
+    assert ret["p.value"] >= expected.pvalue - 1e-6
+
+
+@settings(max_examples=30, deadline=None)
+@given(
+    xn1=sub_pairs(MAX_OBSERVED_N),
+    xn2=sub_pairs(MAX_OBSERVED_N),
+    paramtype=st.sampled_from(["difference", "ratio", "oddsratio"]),
+    alternative=st.sampled_from(["two.sided", "less", "greater"]),
+    method=st.sampled_from(["FisherAdj", "simple", "wald-pooled", "wald-unpooled", "score"]),
+    midp=st.booleans(),
+)
+def test_uncondExact2x2_numpy(xn1, xn2, paramtype, alternative, method, midp):
+    x1, n1 = xn1
+    x2, n2 = xn2
+    if method.startswith("wald") and paramtype != "difference":
+        with pytest.raises(ValueError):
+            pyrexact2x2.uncondExact2x2(
+                x1, n1, x2, n2, parmtype=paramtype, method=method, engine="numpy"
+            )
+        return
+    kwargs = dict(parmtype=paramtype, alternative=alternative, method=method, midp=midp)
+    ret = pyrexact2x2.uncondExact2x2(x1, n1, x2, n2, engine="numpy", **kwargs)
+    assert 0 < ret["p.value"] <= 1
+    expected = pyrexact2x2.uncondExact2x2(x1, n1, x2, n2, **kwargs)
+    assert ret["p.value"] == pytest.approx(expected["p.value"], rel=1e-3, abs=1e-6)
+
+
+def test_uncondExact2x2_numpy_unsupported():
+    for option in ({"conf_int": True}, {"gamma": 1e-6}, {"EplusM": True}):
+        with pytest.raises(ValueError):
+            pyrexact2x2.uncondExact2x2(3, 10, 7, 12, engine="numpy", **option)
+
+
+def test_numpy_cache_size():
+    from pyrexact2x2 import _numpy_engine
+
+    cache = _numpy_engine._array_cache
+    try:
+        pyrexact2x2.set_numpy_cache_size(2 ** 20)
+        for n in range(100, 140):
+            pyrexact2x2.boschloo(n // 3, n, n // 2, n, engine="numpy")
+            pyrexact2x2.uncondExact2x2(n // 3, n, n // 2, n, method="score", engine="numpy")
+            assert 0 < cache.nbytes <= 2 ** 20
+        pyrexact2x2.set_numpy_cache_size(0)
+        assert cache.nbytes == 0
+        ret = pyrexact2x2.boschloo(3, 10, 7, 12, engine="numpy")
+        assert cache.nbytes == 0
+        pyrexact2x2.set_numpy_cache_size(128 * 2 ** 20)
+        assert pyrexact2x2.boschloo(3, 10, 7, 12, engine="numpy").p_value == ret.p_value
+    finally:
+        pyrexact2x2.set_numpy_cache_size(128 * 2 ** 20)
+
+
+def test_control_grid():
+    exact = pyrexact2x2.boschloo(
+        12, 40, 20, 38, engine="numpy", control=pyrexact2x2.ucControl(nPgrid=2000)
+    )["p.value"]
+    coarse = pyrexact2x2.boschloo(12, 40, 20, 38, engine="numpy", control={"nPgrid": 5})
+    adaptive = pyrexact2x2.boschloo(
+        12, 40, 20, 38, engine="numpy", control={"nPgrid": 5, "adaptive": True, "ptol": 1e-9}
+    )
+    assert coarse["p.value"] <= exact + 1e-9
+    assert adaptive["p.value"] == pytest.approx(exact, abs=1e-7)
+    with pytest.raises(TypeError):
+        pyrexact2x2.boschloo(1, 5, 0, 6, engine="numpy", control={"nPGrid": 5})
@@ -0,0 +1,52 @@
+import numpy as np
+import pytest
+
+import pyrexact2x2
+from pyrexact2x2 import _pvals
+from pyrexact2x2._result import BatchResult
+
+
+def test_pvalues_batch(monkeypatch):
+    calls = []
+
+    def fake_batch(test, cols, options):
+        calls.append((test, len(cols["x1"])))
+        return BatchResult(np.stack([cols["x1"] + 0.5 * (options["method"] == "score")] * 4))
+
+    monkeypatch.setattr(_pvals, "_run_batch", fake_batch)
+    method = np.array(["simple"] * 4 + ["score"])
+    ret = pyrexact2x2.uncondExact2x2_pvalues([1, 2, 0, 3, 1], 5, 0, 6, method=method)
+    assert ret.tolist() == [1, 2, 0, 3, 1.5]
+    assert calls == [("uncondExact2x2", 5)]
+
+
+@pytest.mark.parametrize("alternative", ["two.sided", "less", "greater"])
+@pytest.mark.parametrize("midp", [False, True])
+def test_pvalues_numpy(alternative, midp):
+    x1 = np.array([1, 2, 0, 3, 1, 0, 0, 5, 1, 1])
+    n1 = np.array([5, 5, 4, 5, 5, 1, 1, 5, 1, 1])
+    x2 = np.array([0, 4, 2, 1, 0, 0, 1, 6, 1, 1])
+    n2 = np.array([6, 6, 4, 6, 6, 1, 1, 6, 1, 1])
+    method = np.array(["simple"] * 4 + ["score"] + ["wald-pooled"] * 5)
+    tsmethod = np.array(["central"] * 3 + ["square"] * 7)
+    kwargs = dict(alternative=alternative, midp=midp)
+    ret = pyrexact2x2.uncondExact2x2_pvalues(
+        x1, n1, x2, n2, method=method, tsmethod=tsmethod, engine="numpy", **kwargs
+    )
+    expected = [
+        pyrexact2x2.uncondExact2x2(*t, method=m, tsmethod=ts, engine="numpy", **kwargs)["p.value"]
+        for *t, m, ts in zip(x1, n1, x2, n2, method, tsmethod)
+    ]
+    assert ret.tolist() == pytest.approx(expected, abs=1e-6)
+
+    with pytest.raises(ValueError):
+        pyrexact2x2.uncondExact2x2_pvalues(x1, n1, x2, n2, gamma=1e-6, engine="numpy")
+
+
+def test_uncondExact2x2Pvals():
+    pvals = pyrexact2x2.uncondExact2x2Pvals(5, 6, method="simple")
+    assert pvals.shape == (6, 7)
+    single = pyrexact2x2.uncondExact2x2(1, 5, 4, 6, method="simple")
+    assert pvals[1, 4] == pytest.approx(single["p.value"])
+    ret = pyrexact2x2.uncondExact2x2_pvalues([1, 3], 5, [4, 0], 6, method="simple")
+    assert ret.tolist() == pytest.approx([pvals[1, 4], pvals[3, 0]])
@@ -1,6 +1,7 @@
 # This test code was written by the `hypothesis.extra.ghostwriter` module
 # and is provided under the Creative Commons Zero public domain dedication.
 
+import numpy as np
 import pytest
 from logging import info
 from sys import float_info
@@ -257,6 +258,65 @@ def test_boschloo(
     assert ret["p.value"] > 0
     
 
+def test_session():
+    session = pyrexact2x2.get_session()
+    assert session is pyrexact2x2.get_session()
+    status = session.warmup().health()
+    assert status["ok"], status
+    assert session.initialized
+
+
+def test_uncondExact2x2_many():
+    x1, n1, x2, n2 = [1, 3, 0, 7], [5, 8, 6, 9], [0, 4, 2, 1], [6, 8, 4, 9]
+    ret = pyrexact2x2.uncondExact2x2_many(x1, n1, x2, n2, method=["simple", "score"] * 2)
+    for i, table in enumerate(zip(x1, n1, x2, n2)):
+        single = pyrexact2x2.uncondExact2x2(*table, method=["simple", "score"][i % 2])
+        assert ret["p.value"][i] == pytest.approx(single["p.value"])
+        assert ret["estimate"][i] == pytest.approx(single["estimate"])
+    assert len(pyrexact2x2.boschloo_many(x1, n1, x2, n2)["p.value"]) == 4
+
+
+def test_batch_dedup():
+    from pyrexact2x2._batch import _distinct
+
+    cols = {"x1": np.array([1, 3, 1, 1]), "n1": 5, "x2": np.array([0, 2, 0, 0]), "n2": 6}
+    cols = {k: np.broadcast_to(v, 4) for k, v in cols.items()}
+    first, inverse = _distinct(cols, {"method": np.array(["score", "score", "score", "simple"])})
+    assert len(first) == 3
+    assert inverse[0] == inverse[2] != inverse[3]
+    assert first[inverse].tolist() == [0, 1, 0, 3]
+
+    pyrexact2x2.batch_info_clear()
+    x1, x2 = [1, 3, 1, 1, 3, 1], [0, 2, 0, 0, 2, 0]
+    ret = pyrexact2x2.boschloo_many(x1, 5, x2, 6)
+    for i, (a, b) in enumerate(zip(x1, x2)):
+        assert ret.p_value[i] == pytest.approx(pyrexact2x2.boschloo(a, 5, b, 6).p_value)
+    assert pyrexact2x2.batch_info() == (1, 6, 2, 3.0)
+
+
+def test_batch_conversion():
+    from rpy2 import robjects
+
+    from pyrexact2x2._batch import _column, _from_r_matrix, _to_r_vector
+
+    assert list(_to_r_vector(np.array([1, 2, 3], dtype=np.int64))) == [1, 2, 3]
+    assert list(_to_r_vector(np.array([True, False]))) == [True, False]
+    assert list(_to_r_vector(np.arange(3.0)[::2])) == [0.0, 2.0]
+    assert list(_to_r_vector(np.array(["score", "simple"]))) == ["score", "simple"]
+    out = robjects.r("matrix(as.numeric(1:8), nrow = 2)")
+    assert _from_r_matrix(out, 2).tolist() == [[1, 2], [3, 4], [5, 6], [7, 8]]
+    assert _column(np.array(["a", "bc"], dtype=object)).dtype.kind == "U"
+
+
+def test_many_arrow():
+    pa = pytest.importorskip("pyarrow")
+
+    x1, x2 = pa.chunked_array([[1, 3], [0]]), pa.array([0, 4, 2])
+    ret = pyrexact2x2.uncondExact2x2_many(x1, 5, x2, 6, method=pa.array(["score"] * 3))
+    expected = pyrexact2x2.uncondExact2x2_many([1, 3, 0], 5, [0, 4, 2], 6, method="score")
+    np.testing.assert_array_equal(ret.p_value, expected.p_value)
+
+
 def test_uncondExact2x2DF():
     import pandas as pd
     
@@ -270,6 +330,53 @@ def test_uncondExact2x2DF():
     return ret
 
 
+def test_uncondExact2x2DF_many():
+    import pandas as pd
+
+    df = pd.DataFrame(
+        {"a": [28, 1], "b": [99, 4], "c": [17, 0], "d": [78, 6]}, index=["t1", "t2"]
+    )
+    ret = pyrexact2x2.uncondExact2x2DF_many(df, cells=("a", "b", "c", "d"), parmtype="odds")
+    assert list(ret.index) == ["t1", "t2"]
+    single = pyrexact2x2.uncondExact2x2DF(
+        pd.DataFrame([[28, 99], [17, 78]]), parmtype="odds"
+    )
+    assert ret.loc["t1", "p.value"] == pytest.approx(single["p.value"])
+
+    xn = pd.DataFrame({"x1": df.a, "n1": df.a + df.b, "x2": df.c, "n2": df.c + df.d})
+    ret2 = pyrexact2x2.uncondExact2x2DF_many(xn, parmtype="odds")
+    assert ret2["p.value"].tolist() == pytest.approx(ret["p.value"].tolist())
+
+
+def test_pool():
+    x1, n1, x2, n2 = [1, 3, 0, 7, 2], [5, 8, 6, 9, 4], [0, 4, 2, 1, 4], [6, 8, 4, 9, 4]
+    expected = pyrexact2x2.boschloo_many(x1, n1, x2, n2)
+    with pyrexact2x2.Pool(workers=2, chunksize=2) as pool:
+        ret = pool.map(x1, n1, x2, n2, test="boschloo")
+        assert ret["p.value"].tolist() == pytest.approx(expected["p.value"].tolist())
+
+        seen = {}
+        for idx, res in pool.imap_unordered(x1, n1, x2, n2, test="boschloo"):
+            seen.update(zip(idx.tolist(), res["p.value"].tolist()))
+        assert [seen[i] for i in range(5)] == pytest.approx(expected["p.value"].tolist())
+
+        chunks = [{"x1": x1[i : i + 2], "n1": n1[i : i + 2], "x2": x2[i : i + 2], "n2": n2[i : i + 2]}
+                  for i in range(0, 5, 2)]
+        streamed = list(pool.imap_chunks(iter(chunks), test="boschloo", max_pending=1))
+        assert [len(r) for r in streamed] == [2, 2, 1]
+        assert np.concatenate([r.p_value for r in streamed]).tolist() == pytest.approx(
+            expected["p.value"].tolist()
+        )
+
+
+def test_pool_without_r():
+    if pyrexact2x2.get_session().health()["ok"]:
+        pytest.skip("R is available")
+    with pyrexact2x2.Pool(workers=1) as pool:
+        with pytest.raises(RuntimeError, match="R could not be started"):
+            pool.map([1], [5], [0], [6])
+
+
 if __name__ == "__main__":
     r = test_uncondExact2x2DF() 
     print(r)
\ No newline at end of file
@@ -0,0 +1,52 @@
+import math
+import pickle
+
+import numpy as np
+import pytest
+
+import pyrexact2x2
+from pyrexact2x2 import BatchResult, Result
+from pyrexact2x2._cache import DiskCache
+
+
+def test_result_keys():
+    res = pyrexact2x2.boschloo(1, 5, 0, 6, engine="numpy")
+    assert isinstance(res, Result)
+    assert res["p.value"] == res.p_value
+    assert res["null.value"] == res.null_value == 1.0
+    assert set(res) == set(res.to_dict())
+    assert "p.value" in res and "p_value" not in res
+    assert res["conf.int"] == (res.ci_low, res.ci_high)
+
+    copy = res.copy()
+    copy["p.value"] = -1.0
+    assert copy.p_value == -1.0 and res.p_value > 0
+    assert Result.from_dict(res.to_dict()) == res
+    assert repr(pickle.loads(pickle.dumps(res))) == repr(res)
+    with pytest.raises(KeyError):
+        res["pvalue"]
+    with pytest.raises(AttributeError):
+        res.extra = 1
+
+
+def test_batch_result():
+    data = np.arange(12, dtype=float).reshape(4, 3)
+    res = BatchResult(data)
+    assert len(res) == 3 and list(res) == ["p.value", "conf.int.low", "conf.int.high", "estimate"]
+    assert res["conf.int.high"].tolist() == res.ci_high.tolist() == [6.0, 7.0, 8.0]
+    assert res[1].p_value == 1.0 and res[1].estimate == 10.0 and math.isnan(res[1].statistic)
+    assert res.to_records()["ci_low"].tolist() == [3.0, 4.0, 5.0]
+    assert res.nbytes == 12 * 8
+
+    both = BatchResult.concatenate([res, pickle.loads(pickle.dumps(res))])
+    assert both.p_value.tolist() == [0.0, 1.0, 2.0] * 2
+    assert len(BatchResult.concatenate([])) == 0
+
+
+def test_disk_cache_result(tmp_path):
+    cache = DiskCache(str(tmp_path / "cache.sqlite"), version="v1")
+    res = Result(0.25, 0.1, 0.9, 2.0, method="Boschloo")
+    cache.put(("boschloo", 1), res)
+    got = cache.get(("boschloo", 1))
+    assert isinstance(got, Result) and got.method == "Boschloo" and got.p_value == 0.25
+    assert got["conf.int"] == (0.1, 0.9)
@@ -0,0 +1,77 @@
+import numpy as np
+import pytest
+
+import pyrexact2x2
+from pyrexact2x2 import _pvals
+
+
+def fake_matrix(n1, n2, options):
+    x1, x2 = np.meshgrid(np.arange(n1 + 1), np.arange(n2 + 1), indexing="ij")
+    return (1000.0 * n1 + 100.0 * n2 + 10.0 * x1 + x2) * (2 if options["midp"] else 1)
+
+
+def test_build_and_lookup(tmp_path, monkeypatch):
+    monkeypatch.setattr(_pvals, "_pvals_matrix", fake_matrix)
+    path = str(tmp_path / "store")
+    pyrexact2x2.build_store(path, range(1, 4), range(2, 5), method="score")
+    pyrexact2x2.build_store(path, range(1, 3), range(1, 3), method="score", midp=True)
+
+    store = pyrexact2x2.PvalueStore(path)
+    assert len(store.options()) == 2
+    assert store.matrix(3, 4, method="score").tolist() == fake_matrix(3, 4, {"midp": False}).tolist()
+    ret = store.lookup([0, 3, 1], [1, 3, 2], [2, 4, 0], [2, 4, 3], method="score")
+    assert ret.tolist() == [1202.0, 3434.0, 2310.0]
+    assert store.lookup(1, 2, 1, 2, method="score", midp=True) == [2 * 2211.0]
+
+    with pytest.raises(KeyError):
+        store.lookup(0, 4, 0, 4, method="score")
+    with pytest.raises(KeyError):
+        store.lookup(0, 4, 0, 3, method="score", alternative="less")
+    with pytest.raises(KeyError):
+        store.lookup(0, 1, 0, 2, method="simple")
+
+    pyrexact2x2.build_store(path, range(1, 2), range(1, 2), method="score")
+    store = pyrexact2x2.PvalueStore(path)
+    assert len(store.options()) == 2
+    assert store.lookup(1, 1, 1, 1, method="score") == [1111.0]
+    with pytest.raises(KeyError):
+        store.lookup(0, 3, 0, 4, method="score")
+
+
+def test_build_store_command(tmp_path, monkeypatch, capsys):
+    from pyrexact2x2.__main__ import main
+
+    monkeypatch.setattr(_pvals, "_pvals_matrix", fake_matrix)
+    path = str(tmp_path / "store")
+    assert main(["build-store", path, "--n1", "1:2", "--n2", "3", "--midp", "true"]) == 0
+    store = pyrexact2x2.PvalueStore(path)
+    assert store.lookup(2, 2, 3, 3, midp=True) == [2 * 2323.0]
+    assert "Built 2 designs" in capsys.readouterr().err
+    assert main(["build-store", path, "--n1", "1:3", "--n2", "1:3", "--canonical"]) == 0
+    assert "Built 6 designs" in capsys.readouterr().err
+
+
+def test_canonical_store(tmp_path, monkeypatch):
+    monkeypatch.setattr(_pvals, "_pvals_matrix", fake_matrix)
+    path = str(tmp_path / "store")
+    store = pyrexact2x2.build_store(path, range(1, 4), range(1, 4), canonical=True)
+    assert store.index["sets"][0]["canonical"]
+    assert store.matrix(3, 1).tolist() == fake_matrix(1, 3, {"midp": False}).T.tolist()
+    # (2, 3, 1, 1) is answered by the stored design (1, 2) as (1, 1, 2, 3).
+    ret = store.lookup([2, 0], [3, 1], [1, 1], [1, 2])
+    assert ret.tolist() == [1312.0, 1201.0]
+    with pytest.raises(ValueError):
+        pyrexact2x2.build_store(path, [1], [2], canonical=True, alternative="less")
+
+
+def test_store_swapped_alternative(tmp_path, monkeypatch):
+    monkeypatch.setattr(_pvals, "_pvals_matrix", fake_matrix)
+    path = str(tmp_path / "store")
+    store = pyrexact2x2.build_store(path, [2], [3], alternative="greater")
+    # Exchanging the groups turns "less" for (3, 2) into "greater" for (2, 3).
+    assert store.lookup(1, 3, 1, 2, alternative="less").tolist() == [2311.0]
+    assert store.matrix(3, 2, alternative="less").tolist() == fake_matrix(2, 3, {"midp": False}).T.tolist()
+    with pytest.raises(KeyError):
+        store.lookup(1, 2, 1, 3, alternative="less")
+    with pytest.raises(KeyError):
+        store.matrix(2, 3, alternative="less")